@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2015 OpenStack Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""A benchmark of the compiled demo catalog index against .mo catalogs.
+
+Synthetic catalogs for the demo domain and its log level domains are
+written to a temporary locale directory and compiled with demo._catalog.
+Each worker is a new process which either loads every .mo catalog, as
+each service process does with gettext, or maps the compiled index, and
+then translates a sample of message IDs. The cold start time and the
+private (unshared) memory of every worker are reported.
+
+Language discovery through demo._i18n.get_available_languages() is then
+timed for the first (listing) call and the cached calls, which requires
+oslo.i18n to be installed.
+"""
+
+from __future__ import division
+from __future__ import print_function
+
+import argparse
+import gettext
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+from demo import _catalog
+
+DOMAINS = ['demo', 'demo-log-info', 'demo-log-warning', 'demo-log-error',
+           'demo-log-critical']
+
+
+def msgid(domain, number):
+    return u'%s message number %d with %%s' % (domain, number)
+
+
+def build_locale(localedir, languages, messages):
+    for number in range(languages):
+        language = 'x%d_XX' % number
+        messages_dir = os.path.join(localedir, language, 'LC_MESSAGES')
+        os.makedirs(messages_dir)
+        for domain in DOMAINS:
+            _catalog.write_mo(os.path.join(messages_dir, domain + '.mo'),
+                              dict((msgid(domain, n),
+                                    u'[%s] %s' % (language, msgid(domain, n)))
+                                   for n in range(messages)))
+
+
+def private_kb():
+    """Return the private (unshared) memory of this process in kB"""
+
+    total = 0
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                if line.startswith(('Private_Clean:', 'Private_Dirty:')):
+                    total += int(line.split()[1])
+    except IOError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return total
+
+
+def worker(mode, localedir, index_path, messages):
+    """Load translations in a new process and report on the cost"""
+
+    before = private_kb()
+    start = time.time()
+    language = sorted(os.listdir(localedir))[0]
+    if mode == 'catalogs':
+        catalogs = {}
+        for lang in sorted(os.listdir(localedir)):
+            for domain in DOMAINS:
+                with open(os.path.join(localedir, lang, 'LC_MESSAGES',
+                                       domain + '.mo'), 'rb') as f:
+                    catalogs[(lang, domain)] = gettext.GNUTranslations(f)
+
+        def translate(domain, msg):
+            return catalogs[(language, domain)].gettext(msg)
+    else:
+        index = _catalog.open_index(index_path)
+
+        def translate(domain, msg):
+            return index.gettext(language, domain, msg)
+
+    for domain in DOMAINS:
+        for n in range(0, messages, max(1, messages // 100)):
+            assert translate(domain, msgid(domain, n)) is not None
+    elapsed = time.time() - start
+
+    print(json.dumps({'seconds': elapsed,
+                      'private_kb': private_kb() - before}))
+
+
+def run_workers(mode, workers, localedir, index_path, messages):
+    procs = [subprocess.Popen([sys.executable, __file__, '--worker', mode,
+                               '--localedir', localedir,
+                               '--index', index_path,
+                               '--messages', str(messages)],
+                              stdout=subprocess.PIPE)
+             for i in range(workers)]
+    results = [json.loads(proc.communicate()[0].decode('utf-8'))
+               for proc in procs]
+    seconds = [result['seconds'] for result in results]
+    private = [result['private_kb'] for result in results]
+    return (sum(seconds) / len(seconds), max(seconds),
+            sum(private) / len(private), sum(private))
+
+
+def discovery(localedir, number):
+    os.environ['DEMO_LOCALEDIR'] = localedir
+    from demo import _i18n
+
+    start = time.time()
+    languages = _i18n.get_available_languages()
+    first = time.time() - start
+    cached = min(timeit.repeat(_i18n.get_available_languages,
+                               number=number, repeat=3)) / number
+    return len(languages), first, cached
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=16,
+                        help='Number of worker processes')
+    parser.add_argument('--languages', type=int, default=20,
+                        help='Number of languages')
+    parser.add_argument('--messages', type=int, default=2000,
+                        help='Number of messages per domain')
+    parser.add_argument('--worker', choices=['catalogs', 'index'],
+                        help=argparse.SUPPRESS)
+    parser.add_argument('--localedir', help=argparse.SUPPRESS)
+    parser.add_argument('--index', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.localedir, args.index, args.messages)
+        return
+
+    tmp = tempfile.mkdtemp()
+    try:
+        localedir = os.path.join(tmp, 'locale')
+        index_path = os.path.join(tmp, 'demo.idx')
+        build_locale(localedir, args.languages, args.messages)
+
+        start = time.time()
+        count = _catalog.compile_index(localedir, 'demo', index_path)
+        print('compiled %d messages (%d kB) in %.3f s' % (
+              count, os.path.getsize(index_path) // 1024,
+              time.time() - start))
+
+        print('%-9s %8s %12s %12s %14s %14s' % (
+              'mode', 'workers', 'avg start s', 'max start s',
+              'avg private kB', 'total private kB'))
+        for mode in ('catalogs', 'index'):
+            print('%-9s %8d %12.4f %12.4f %14.0f %14.0f' % (
+                  (mode, args.workers) + run_workers(
+                      mode, args.workers, localedir, index_path,
+                      args.messages)))
+
+        try:
+            languages, first, cached = discovery(localedir, 10000)
+        except ImportError:
+            print('oslo.i18n is not installed, skipping language discovery')
+        else:
+            print('discovered %d languages: first call %.1f us, '
+                  'cached %.2f us' % (languages, first * 1e6, cached * 1e6))
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2016 OpenStack Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""A benchmark of indexing and comparing .conf.sample files.
+
+The bundled keystone sample is indexed with demo.confsample, then
+versions of it are written to a temporary directory, each changing the
+default of a few options of the one before, as a series of patch sets
+would. Every consecutive pair of versions is compared with a text diff
+(difflib) and with the semantic diff: parsing each version, loading
+the two indexes from the cache directory as a new process would, and
+with the indexes already in this process.
+"""
+
+from __future__ import division
+from __future__ import print_function
+
+import argparse
+import difflib
+import os
+import random
+import shutil
+import tempfile
+import time
+import timeit
+
+from demo import confsample
+
+SAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                      'review', '274270', 'keystone.conf.sample')
+
+
+def write_versions(directory, lines, versions, edits, rng):
+    options = [i for i, line in enumerate(lines)
+               if line.startswith('#') and ' = ' in line and
+               not line.startswith('# ')]
+    paths = []
+    for version in range(versions):
+        for i in rng.sample(options, edits):
+            lines[i] = lines[i].split(' = ')[0] + ' = v%d' % version
+        path = os.path.join(directory, '%d.conf.sample' % version)
+        with open(path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        paths.append(path)
+    return paths
+
+
+def text_diff(old_path, new_path):
+    with open(old_path) as f:
+        old = f.readlines()
+    with open(new_path) as f:
+        new = f.readlines()
+    return list(difflib.unified_diff(old, new))
+
+
+def per_pair_ms(func, paths, setup=None):
+    best = None
+    for repeat in range(3):
+        if setup:
+            setup()
+        start = time.time()
+        for old, new in zip(paths, paths[1:]):
+            func(old, new)
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / (len(paths) - 1) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--versions', type=int, default=50,
+                        help='Number of versions of the sample')
+    parser.add_argument('--edits', type=int, default=3,
+                        help='Options changed by each version')
+    parser.add_argument('--number', type=int, default=20,
+                        help='Iterations of the single file timings')
+    args = parser.parse_args()
+
+    with open(SAMPLE) as f:
+        lines = f.read().splitlines()
+    index = confsample.parse(lines)
+    print('%s: %d lines, %d sections, %d options' % (
+          os.path.relpath(SAMPLE), len(lines), len(index),
+          sum(len(options) for options in index.values())))
+
+    parse = min(timeit.repeat(lambda: confsample.parse(lines),
+                              number=args.number, repeat=3))
+    confsample.index_file(SAMPLE)
+    cached = min(timeit.repeat(lambda: confsample.index_file(SAMPLE),
+                               number=args.number, repeat=3))
+    print('parse %.2f ms, index_file cached by hash %.2f ms' % (
+          parse / args.number * 1e3, cached / args.number * 1e3))
+
+    tmp = tempfile.mkdtemp()
+    try:
+        paths = write_versions(tmp, lines, args.versions, args.edits,
+                               random.Random(42))
+        cache_dir = os.path.join(tmp, 'cache')
+
+        def cli_run(old, new):
+            # As python -m demo.confsample, a new process every time
+            confsample.forget_indexes()
+            confsample.diff_files(old, new, cache_dir)
+
+        text = per_pair_ms(text_diff, paths)
+        parsed = per_pair_ms(confsample.diff_files, paths,
+                             confsample.forget_indexes)
+        # The first repeat fills the cache directory
+        cli = per_pair_ms(cli_run, paths)
+        confsample.forget_indexes()
+        warm = per_pair_ms(confsample.diff_files, paths)
+
+        changes = confsample.diff_files(paths[0], paths[1])
+        assert len(changes) == args.edits, changes
+        print('%d versions, %d options changed by each, ms per pair:' % (
+              len(paths), args.edits))
+        print('  %-36s %8.2f' % ('difflib.unified_diff', text))
+        print('  %-36s %8.2f' % ('diff_files, parsing', parsed))
+        print('  %-36s %8.2f' % ('diff_files, cache directory', cli))
+        print('  %-36s %8.2f' % ('diff_files, indexes in this process',
+                                 warm))
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    main()
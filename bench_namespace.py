@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2015 OpenStack Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""A benchmark of the argument namespace implementations.
+
+Thousands of options are set, read, parsed and deleted on each
+namespace, and the cost per attribute operation is reported. A plain
+object is included as the lower bound.
+
+Namespaces are then created over a set of defaults and config file
+values with a few options set from the command line, each either
+copying every value into its flat dict (delattr2.Child) or layered over
+the shared values (layered.Child), and the creation time and memory per
+namespace are reported. Memory is measured with tracemalloc, which is
+not available on Python 2.7.
+"""
+
+from __future__ import print_function
+
+import argparse
+import timeit
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2.7
+    tracemalloc = None
+
+from demo import delattr2
+from demo import fastattr
+from demo import layered
+
+
+class Plain(delattr2.Parent):
+    pass
+
+
+NAMESPACES = [
+    ('plain object', Plain),
+    ('delattr2.Child', delattr2.Child),
+    ('fastattr.Child', fastattr.Child),
+    ('layered.Child', layered.Child),
+]
+
+
+def per_option_ns(statement, options, number):
+    seconds = min(timeit.repeat(statement, number=number, repeat=3))
+    return seconds / (number * len(options)) * 1e9
+
+
+def bench(factory, options, number):
+    values = dict((name, i) for i, name in enumerate(options))
+    namespace = factory()
+    for name, value in values.items():
+        setattr(namespace, name, value)
+
+    def set_all():
+        for name in options:
+            setattr(namespace, name, 1)
+
+    def get_all():
+        for name in options:
+            getattr(namespace, name)
+
+    def parse_and_delete():
+        fresh = factory()
+        for name in options:
+            setattr(fresh, name, 1)
+        fresh.parse()
+        for name in options:
+            delattr(fresh, name)
+        del fresh._unrecognized_args
+
+    return (per_option_ns(set_all, options, number),
+            per_option_ns(get_all, options, number),
+            per_option_ns(parse_and_delete, options, number))
+
+
+def flat_ns(defaults, config, cli):
+    namespace = delattr2.Child()
+    namespace._cli.update(defaults)
+    namespace._cli.update(config)
+    for name, value in cli.items():
+        setattr(namespace, name, value)
+    return namespace
+
+
+def layered_ns(layers, cli):
+    namespace = layers.namespace()
+    for name, value in cli.items():
+        setattr(namespace, name, value)
+    return namespace
+
+
+def allocated_bytes(create, count):
+    if tracemalloc is None:
+        return None
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        namespaces = [create() for i in range(count)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del namespaces
+    return (after - before) / count
+
+
+def bench_layers(options, cli_options, count):
+    defaults = dict((name, i) for i, name in enumerate(options))
+    config = dict((name, -i) for i, name in enumerate(options[::10]))
+    cli = dict((name, 'cli') for name in options[:cli_options])
+    layers = layered.Layers(defaults, config)
+
+    creates = [
+        ('flat dict', lambda: flat_ns(defaults, config, cli)),
+        ('layered.Child', lambda: layered_ns(layers, cli)),
+    ]
+    for name, create in creates:
+        namespace = create()
+        for option in options:
+            expected = cli.get(option, config.get(option, defaults[option]))
+            assert getattr(namespace, option) == expected, option
+        seconds = min(timeit.repeat(create, number=count, repeat=3))
+        size = allocated_bytes(create, count)
+        print('%-16s %12.1f %12s' % (
+              name, seconds / count * 1e6,
+              '-' if size is None else '%.0f' % size))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--options', type=int, default=5000,
+                        help='Number of options')
+    parser.add_argument('--number', type=int, default=20,
+                        help='Iterations over the options per run')
+    parser.add_argument('--cli-options', type=int, default=10,
+                        help='Options set from the command line')
+    parser.add_argument('--namespaces', type=int, default=200,
+                        help='Namespaces created per run')
+    args = parser.parse_args()
+
+    options = ['option_%d' % i for i in range(args.options)]
+    print('%d options, ns per option' % len(options))
+    print('%-16s %8s %8s %18s' % ('namespace', 'set', 'get',
+                                  'set+parse+delete'))
+    for name, factory in NAMESPACES:
+        print('%-16s %8.0f %8.0f %18.0f' % (
+              (name,) + bench(factory, options, args.number)))
+
+    print()
+    print('%d options, %d from the command line, per namespace' % (
+          len(options), args.cli_options))
+    print('%-16s %12s %12s' % ('namespace', 'create us', 'bytes'))
+    bench_layers(options, args.cli_options, args.namespaces)
+
+
+if __name__ == '__main__':
+    main()
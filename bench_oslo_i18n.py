@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2015 OpenStack Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""A microbenchmark of the demo._i18n translators.
+
+This benchmark requires the following module to be installed.
+
+$ pip install oslo.i18n
+
+The message IDs are the ones used by the usage_oslo_i18n.Demo patterns.
+With --lazy, oslo.i18n lazy translation is enabled so each uncached call
+builds a Message, as services that enable lazy translation do, and the
+demo._i18n translators keep one Message per message ID. Without it they
+are the TranslatorFactory functions themselves.
+
+The second table is the cost of a LOG.info call filtered out by the log
+level, for each way of translating its message.
+"""
+
+from __future__ import print_function
+
+import argparse
+import logging
+import timeit
+
+import oslo_i18n
+
+from demo import _i18n
+
+# Message IDs as used in usage_oslo_i18n.Demo, by translator
+MESSAGES = {
+    'primary': ["Unable to determine contents of %s."],
+    'log_warning': ["Unable to open file %s",
+                    "Unable to open file %(file)s in %(dir)s",
+                    "Unable to open file"],
+    'log_error': ["Unable to parse integer from %s"],
+}
+
+# The demo._i18n translator of each TranslatorFactory name
+CACHED = {
+    'primary': '_',
+    'log_warning': '_LW',
+    'log_error': '_LE',
+}
+
+
+def calls_per_second(translate, messages, number):
+    def run():
+        for msg in messages:
+            translate(msg)
+
+    seconds = min(timeit.repeat(run, number=number, repeat=3))
+    return number * len(messages) / seconds
+
+
+def filtered_call_cost(number):
+    log = logging.getLogger('bench_oslo_i18n.filtered')
+    log.addHandler(logging.NullHandler())
+    log.propagate = False
+    log.setLevel(logging.WARNING)
+
+    file_name = ".does.not.exist"
+    log_info = _i18n._translators.log_info
+    calls = [
+        ('untranslated', lambda: log.info("Unable to open file %s",
+                                          file_name)),
+        ('factory', lambda: log.info(log_info("Unable to open file %s"),
+                                     file_name)),
+        ('_LI', lambda: log.info(_i18n._LI("Unable to open file %s"),
+                                 file_name)),
+        ('_DLI', lambda: log.info(_i18n._DLI("Unable to open file %s"),
+                                  file_name)),
+    ]
+
+    results = []
+    for name, call in calls:
+        seconds = min(timeit.repeat(call, number=number, repeat=3))
+        results.append((name, seconds / number * 1e9))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--number', type=int, default=100000,
+                        help='Iterations over the message IDs per run')
+    parser.add_argument('--lazy', action='store_true',
+                        help='Enable oslo.i18n lazy translation')
+    args = parser.parse_args()
+
+    if args.lazy:
+        oslo_i18n.enable_lazy()
+
+    print('%-12s %14s %14s %8s' % ('translator', 'factory/s', '_i18n/s',
+                                   'speedup'))
+    for name, messages in sorted(MESSAGES.items()):
+        # The uncached function is what the TranslatorFactory returns
+        uncached = calls_per_second(getattr(_i18n._translators, name),
+                                    messages, args.number)
+        _i18n.clear_cache()
+        cached = calls_per_second(getattr(_i18n, CACHED[name]), messages,
+                                  args.number)
+        print('%-12s %14.0f %14.0f %7.1fx' % (name, uncached, cached,
+                                              cached / uncached))
+
+    print()
+    print('%-12s %14s' % ('filtered', 'ns/call'))
+    for name, nanoseconds in filtered_call_cost(args.number):
+        print('%-12s %14.0f' % (name, nanoseconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -13,46 +13,90 @@
 # under the License.
 
 from __future__ import division
-import sys
+import argparse
 import os
 import urllib2
-import httplib    # For the  httplib.BadStatusLine Exception
+import httplib    # For httplib.HTTPException
 import json
 import logging
 import pickle
+import socket
+import threading
 import time
 from coveragelink import CoverageLink
+from poller import AdaptivePoller
+from poller import CEILING_SECONDS
+from poller import FLOOR_SECONDS
+from seenjobs import SeenJobs
 
 
 LINKS_JSON_FILE = 'links.json'
+SEEN_JOBS_FILE = LINKS_JSON_FILE + '.seen'
+POLL_STATE_FILE = LINKS_JSON_FILE + '.poll'
 ZUUL_STATUS_FILE = 'status.json'
 DEFAULT_ZUUL_STATUS_URL = 'http://zuul.openstack.org/' + ZUUL_STATUS_FILE
 DEFAULT_OUTPUT_LOGS = 'http://logs.openstack.org'
 PURGE_SECONDS = 60 * 5  # 5 minutes
+READ_TIMEOUT_SECONDS = 20
+READ_RETRIES = 2
+READ_BACKOFF_SECONDS = 2
+
+_status_file_lock = threading.Lock()
 
 
 class CoverageIndex(object):
 
     @staticmethod
-    def read_from_url(zuul_status_url=DEFAULT_ZUUL_STATUS_URL):
-        """Get the provided Zuul status file via provided url"""
+    def read_from_url(zuul_status_url=DEFAULT_ZUUL_STATUS_URL,
+                      timeout=READ_TIMEOUT_SECONDS, validators=None):
+        """Get the provided Zuul status file via provided url
+
+        When a validators dict is provided the request is conditional on
+        the ETag and Last-Modified values it holds, which are updated from
+        a response that parsed. None is returned if the status was not
+        modified.
+        """
+
+        req = urllib2.Request(zuul_status_url)
+        if validators:
+            if validators.get('etag'):
+                req.add_header('If-None-Match', validators['etag'])
+            if validators.get('last_modified'):
+                req.add_header('If-Modified-Since',
+                               validators['last_modified'])
 
         try:
-            res = urllib2.urlopen(zuul_status_url)
+            res = urllib2.urlopen(req, timeout=timeout)
             json_contents = res.read()
-            with open(os.path.join(os.sep, 'tmp', ZUUL_STATUS_FILE), 'w') as f:
-                f.write(json_contents)
+            with _status_file_lock:
+                with open(os.path.join(os.sep, 'tmp', ZUUL_STATUS_FILE),
+                          'w') as f:
+                    f.write(json_contents)
+
+        except urllib2.HTTPError as e:
+            if e.code == 304:
+                logging.debug('Zuul status not modified at ' +
+                              zuul_status_url)
+                return None
+            raise Exception('Unable to read Zuul status at ' + zuul_status_url)
 
-        except (urllib2.HTTPError, httplib.BadStatusLine):
+        except (urllib2.URLError, httplib.HTTPException, socket.error):
             raise Exception('Unable to read Zuul status at ' + zuul_status_url)
 
         try:
-            return json.loads(json_contents)
+            data = json.loads(json_contents)
 
         except ValueError:
             raise Exception('Unable to parse JSON Zuul status at ' +
                             zuul_status_url)
 
+        # Only a status that parsed may be skipped as not modified later
+        if validators is not None:
+            validators['etag'] = res.info().getheader('ETag')
+            validators['last_modified'] = \
+                res.info().getheader('Last-Modified')
+        return data
+
     @staticmethod
     def read_from_file(filename=ZUUL_STATUS_FILE):
         """Read the Zuul status from the provided filename"""
@@ -71,9 +115,78 @@ class CoverageIndex(object):
             raise Exception('Unable to parse JSON Zuul status from ' +
                             filename)
 
-    def parse_status(self, data):
+    @staticmethod
+    def read_from_source(source, timeout=READ_TIMEOUT_SECONDS,
+                         retries=READ_RETRIES, backoff=READ_BACKOFF_SECONDS,
+                         validators=None):
+        """Read the Zuul status from the provided url or filename,
+        retrying urls with an exponential backoff
+        """
+
+        if not source.startswith(('http://', 'https://')):
+            return CoverageIndex.read_from_file(source)
+
+        delay = backoff
+        for attempt in range(retries + 1):
+            try:
+                return CoverageIndex.read_from_url(source, timeout,
+                                                   validators)
+
+            # if there is an error reading url or parsing url, try again
+            except Exception:
+                if attempt == retries:
+                    raise
+                logging.warning('Attempt {} to read from {} failed, retrying '
+                                'in {} seconds'.format(attempt + 1, source,
+                                                       delay))
+                time.sleep(delay)
+                delay *= 2
+
+    @staticmethod
+    def read_from_sources(sources, timeout=READ_TIMEOUT_SECONDS,
+                          retries=READ_RETRIES, backoff=READ_BACKOFF_SECONDS,
+                          validators=None):
+        """Read the Zuul status from each of the provided sources
+        concurrently, returning a list of (source, data) for those
+        that could be read
+
+        The data is None for urls that were not modified since the
+        request that returned the validators kept for that source.
+        """
+
+        results = {}
+        if validators is not None:
+            for source in sources:
+                validators.setdefault(source, {})
+
+        def read(source):
+            try:
+                results[source] = CoverageIndex.read_from_source(
+                    source, timeout, retries, backoff,
+                    validators[source] if validators is not None else None)
+            except Exception as e:
+                logging.error(str(e))
+
+        threads = []
+        for source in sources:
+            thread = threading.Thread(target=read, args=(source,))
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+
+        for thread in threads:
+            thread.join()
+
+        return [(source, results[source]) for source in sources
+                if source in results]
+
+    def parse_status(self, data, seen=None, source=None):
         """Parse the provided Zuul Status for post/check pipelines
         and look for coverage jobs
+
+        When a SeenJobs record is provided only jobs not already seen
+        in an earlier status are returned. Links are tagged with the
+        status source they were found in.
         """
 
         coverage_links = []
@@ -81,12 +194,13 @@ class CoverageIndex(object):
         for pipeline in data['pipelines']:
             if pipeline['name'] in ['post', 'check']:
                 links = self.process_pipeline(pipeline['name'],
-                                              pipeline['change_queues'])
+                                              pipeline['change_queues'],
+                                              seen, source)
                 coverage_links += links
 
         return coverage_links
 
-    def process_pipeline(self, type, queues):
+    def process_pipeline(self, type, queues, seen=None, source=None):
         """For the given pipeline queues identify coverage jobs
         and generate the url for the project and pipeline type
         """
@@ -106,11 +220,18 @@ class CoverageIndex(object):
                     for job in head['jobs']:
 
                         job_name = job['name']
+                        if not job_name.endswith(coverage_suffix):
+                            continue
+                        # Skip jobs already captured in an earlier status
+                        if seen is not None and job['uuid'] and \
+                                not seen.add(job['uuid']):
+                            continue
+
                         project = job_name[:len(job_name) -
                                            len(coverage_suffix)]
                         uri = []
                         # For 'post' pipeline coverage jobs
-                        if job_name.endswith(coverage_suffix) and job['uuid']:
+                        if job['uuid']:
 
                             uuid_prefix = job['uuid'][:7]
                             if type == pipeline_post:
@@ -131,24 +252,31 @@ class CoverageIndex(object):
                         if uri:
                             url = '/'.join(['http://logs.openstack.org'] + uri)
                             logging.debug(url)
-                            link = CoverageLink(project, url, type)
+                            link = CoverageLink(project, url, type,
+                                                uuid=job['uuid'],
+                                                source=source)
                             links.append(link)
 
         logging.info('Captured {} links for {} '.format(len(links), type))
         return links
 
-    def validate_links(self, new_links):
+    def validate_links(self, new_links, active=()):
         """Process the list of coverage urls to confirm they
         exist and have a total line
+
+        Links already validated are not checked again, and pending
+        links for jobs still in the active status are not purged.
         """
 
         for entry in new_links:
-            if entry:
+            if entry and not entry.isValid():
                 try:
                     entry.validate()
 
                 except Exception as e:
                     logging.warn(str(e))
+                    if entry.uuid in active:
+                        continue
                     if int(time.time()) - entry.created > PURGE_SECONDS:
                         logging.debug("Purging old link " + entry.url)
                         new_links.remove(entry)
@@ -231,33 +359,61 @@ class CoverageIndex(object):
 
         return
 
-    def __init__(self, filename=None):
+    def __init__(self, sources=None, poll_floor=FLOOR_SECONDS,
+                 poll_ceiling=CEILING_SECONDS):
 
         logging.info('Processing started')
-        # Determine if to process url or provided file
-        if filename:
-            data = self.read_from_file(sys.argv[1])
-        else:
-            try:
-                data = self.read_from_url()
-            # if there is an error reading url or parsing url, try again
-            except Exception:
-                logging.warning(
-                    'First attempt to read from url failed, retrying')
-                time.sleep(2)
-                data = self.read_from_url()
+        # Sources are any mix of Zuul status urls and files
+        if not sources:
+            sources = [DEFAULT_ZUUL_STATUS_URL]
+        elif isinstance(sources, basestring):
+            sources = [sources]
+
+        poller = AdaptivePoller(poll_floor, poll_ceiling)
+        poller.load(POLL_STATE_FILE)
+        # Only keep validators for the sources still being polled
+        validators = dict((source, poller.validators.get(source, {}))
+                          for source in sources)
+        statuses = self.read_from_sources(sources, validators=validators)
+        poller.validators = validators
+        if not statuses:
+            raise Exception('Unable to read Zuul status from ' +
+                            ', '.join(sources))
+
+        seen = SeenJobs()
+        seen.load(SEEN_JOBS_FILE)
+        seen.evict()
+        seen.begin()
+        new_links = []
+        not_modified = 0
+        for source, data in statuses:
+            if data is None:
+                not_modified += 1
+                continue
+            new_links += self.parse_status(data, seen, source)
+        if not_modified:
+            seen.carry_over()
 
-        new_links = self.parse_status(data)
-        if len(new_links) == 0:      # No new work
+        existing_links = self.read_existing_links()
+        pending = [entry for entry in existing_links
+                   if entry and not entry.isValid()]
+
+        self.poll_interval = poller.update(len(new_links), not_modified,
+                                           len(statuses), len(pending))
+        poller.save(POLL_STATE_FILE)
+
+        if len(new_links) == 0 and len(pending) == 0:      # No new work
+            seen.save(SEEN_JOBS_FILE)
             return
 
         self.validate_links(new_links)
-        # TODO Append existing links
-        existing_links = self.read_existing_links()
         if existing_links:
-            self.validate_links(existing_links)
+            self.validate_links(existing_links, seen.current)
             new_links = existing_links + new_links
         self.publish_links(new_links)
+        # Only once published, so the jobs of links lost to a failure
+        # before are read again from the next status
+        seen.save(SEEN_JOBS_FILE)
 
 
 if __name__ == '__main__':
@@ -265,4 +421,15 @@ if __name__ == '__main__':
     logging.basicConfig(format='%(asctime)s - %(levelname)s - %(message)s',
                         level=logging.DEBUG)
 
-    CoverageIndex(sys.argv[1] if len(sys.argv) > 1 else None)
+    parser = argparse.ArgumentParser(
+        description='Publish an index of OpenStack coverage reports')
+    parser.add_argument('sources', nargs='*',
+                        help='Zuul status urls or files (default: {})'.format(
+                            DEFAULT_ZUUL_STATUS_URL))
+    parser.add_argument('--poll-floor', type=int, default=FLOOR_SECONDS,
+                        help='Shortest poll interval in seconds')
+    parser.add_argument('--poll-ceiling', type=int, default=CEILING_SECONDS,
+                        help='Longest poll interval in seconds')
+    args = parser.parse_args()
+
+    CoverageIndex(args.sources, args.poll_floor, args.poll_ceiling)
@@ -0,0 +1,166 @@
+import BaseHTTPServer
+import json
+import threading
+import time
+import unittest
+from coverageindex import CoverageIndex
+from coverageindex import PURGE_SECONDS
+from coveragelink import CoverageLink
+from seenjobs import SeenJobs
+
+
+def status(job_name, uuid):
+    return {'pipelines': [
+        {'name': 'check',
+         'change_queues': [
+             {'heads': [[{'id': '219727,1',
+                          'jobs': [{'name': job_name, 'uuid': uuid}]}]]}]}]}
+
+
+class StatusServer(object):
+    """A local stand-in for a Zuul status endpoint"""
+
+    def __init__(self, code=200, body=None, delay=0, etag=None):
+        server = self
+        self.responded = []
+
+        class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+            def do_GET(self):
+                time.sleep(delay)
+                server.responded.append(time.time())
+                if etag and self.headers.getheader('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(code)
+                if etag:
+                    self.send_header('ETag', etag)
+                self.end_headers()
+                if isinstance(body, str):
+                    self.wfile.write(body)
+                else:
+                    self.wfile.write(json.dumps(body))
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = BaseHTTPServer.HTTPServer(('127.0.0.1', 0), Handler)
+        self.url = 'http://127.0.0.1:%d/status.json' % self.httpd.server_port
+        self.thread = threading.Thread(target=self.httpd.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class CoverageIndexTestsCase(unittest.TestCase):
+
+    def setUp(self):
+        self.servers = []
+
+    def tearDown(self):
+        for server in self.servers:
+            server.stop()
+
+    def server(self, *args, **kwargs):
+        server = StatusServer(*args, **kwargs)
+        self.servers.append(server)
+        return server
+
+    def test_read_from_sources(self):
+        one = self.server(body=status('rally-coverage', '3550a36aaa'))
+        two = self.server(body=status('nova-coverage', 'b97f0c2bbb'))
+        failing = self.server(code=500)
+
+        results = CoverageIndex.read_from_sources(
+            [one.url, failing.url, two.url], timeout=1, retries=1,
+            backoff=0.1)
+        self.assertEqual([source for source, data in results],
+                         [one.url, two.url])
+
+        index = CoverageIndex.__new__(CoverageIndex)
+        links = []
+        for source, data in results:
+            links += index.parse_status(data, source=source)
+        self.assertEqual([(link.project, link.source) for link in links],
+                         [('rally', one.url), ('nova', two.url)])
+
+    def test_slow_source_does_not_delay_others(self):
+        fast = self.server(body=status('rally-coverage', '3550a36aaa'))
+        slow = self.server(body=status('nova-coverage', 'b97f0c2bbb'),
+                           delay=2)
+
+        start = time.time()
+        results = CoverageIndex.read_from_sources(
+            [slow.url, fast.url], timeout=0.5, retries=1, backoff=0.1)
+        elapsed = time.time() - start
+
+        self.assertEqual([source for source, data in results], [fast.url])
+        # The fast source is listed after the slow one, yet is answered
+        # well before the slow source's first attempt times out
+        self.assertEqual(len(fast.responded), 1)
+        self.assertLess(fast.responded[0] - start, 0.4)
+        # Both attempts on the slow source time out, bounding the run
+        self.assertGreater(elapsed, 1.0)
+        self.assertLess(elapsed, 1.9)
+
+    def test_read_not_modified(self):
+        server = self.server(body=status('rally-coverage', '3550a36aaa'),
+                             etag='"v1"')
+        validators = {}
+
+        results = CoverageIndex.read_from_sources([server.url],
+                                                  validators=validators)
+        self.assertIsNotNone(results[0][1])
+        self.assertEqual(validators[server.url]['etag'], '"v1"')
+
+        results = CoverageIndex.read_from_sources([server.url],
+                                                  validators=validators)
+        self.assertEqual(results, [(server.url, None)])
+
+    def test_invalid_status_is_not_validated(self):
+        server = self.server(body='{"pipelines": [', etag='"v1"')
+        validators = {}
+
+        results = CoverageIndex.read_from_sources(
+            [server.url], retries=1, backoff=0.1, validators=validators)
+        # The retry is not answered as not modified, and the next poll
+        # requests the whole status again
+        self.assertEqual(results, [])
+        self.assertEqual(len(server.responded), 2)
+        self.assertEqual(validators[server.url], {})
+
+    def test_parse_status_skips_seen_jobs(self):
+        index = CoverageIndex.__new__(CoverageIndex)
+        seen = SeenJobs()
+
+        links = index.parse_status(status('rally-coverage', '3550a36aaa'),
+                                   seen)
+        self.assertEqual([link.uuid for link in links], ['3550a36aaa'])
+
+        # The same status again has nothing new
+        self.assertEqual(index.parse_status(
+            status('rally-coverage', '3550a36aaa'), seen), [])
+
+        links = index.parse_status(status('rally-coverage', 'b97f0c2bbb'),
+                                   seen)
+        self.assertEqual([link.uuid for link in links], ['b97f0c2bbb'])
+
+    def test_validate_links_keeps_active_pending_links(self):
+        index = CoverageIndex.__new__(CoverageIndex)
+        expired = int(time.time()) - PURGE_SECONDS - 1
+        active = CoverageLink('rally', 'not-a-url', 'check',
+                              uuid='3550a36aaa')
+        finished = CoverageLink('nova', 'not-a-url', 'check',
+                                uuid='b97f0c2bbb')
+        active.created = finished.created = expired
+
+        links = [active, finished]
+        index.validate_links(links, set(['3550a36aaa']))
+        self.assertEqual(links, [active])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -29,6 +29,8 @@ class CoverageLink(object):
     url = ''
     type = ''         # type is specific for Zuul gate links
     status = ''
+    uuid = None       # Zuul job uuid, to match jobs still in the status
+    source = None     # Zuul status url or file the link was found in
 
     created = 0       # keep a record to purge older entries
 
@@ -39,13 +41,16 @@ class CoverageLink(object):
     partial = 0
     percent = 0.0
 
-    def __init__(self, project, url, type=None, status='unknown'):
+    def __init__(self, project, url, type=None, status='unknown', uuid=None,
+                 source=None):
         """Coverage link class initialization"""
 
         self.project = project
         self.url = url
         self.type = type
         self.status = status
+        self.uuid = uuid
+        self.source = source
         self.created = int(time.time())
 
     def __str__(self):
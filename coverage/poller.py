@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from __future__ import division
+import json
+import logging
+
+
+FLOOR_SECONDS = 15
+CEILING_SECONDS = 60 * 5  # 5 minutes
+INITIAL_SECONDS = 60
+SMOOTHING = 0.3           # weight of the latest cycle in the 304 ratio
+
+
+class AdaptivePoller(object):
+    """Choose the interval until the next Zuul status poll based on
+    how much the status feed changed in the last cycle
+
+    New jobs halve the interval, pending validations hold it, and quiet
+    cycles grow it, faster when the sources keep answering 304 Not
+    Modified. The interval is always kept between the floor and ceiling.
+    """
+
+    def __init__(self, floor=FLOOR_SECONDS, ceiling=CEILING_SECONDS,
+                 interval=INITIAL_SECONDS):
+        """Adaptive poller class initialization"""
+
+        if floor > ceiling:
+            raise Exception('Poll floor {} is above ceiling {}'.format(
+                            floor, ceiling))
+
+        self.floor = floor
+        self.ceiling = ceiling
+        self.interval = self.clamp(interval)
+        self.new_jobs = 0
+        self.pending = 0
+        self.not_modified_ratio = 0.0
+        self.validators = {}
+
+    def clamp(self, interval):
+        return int(max(self.floor, min(self.ceiling, interval)))
+
+    def update(self, new_jobs, not_modified, sources, pending):
+        """Record the latest cycle and return the next poll interval"""
+
+        self.new_jobs = new_jobs
+        self.pending = pending
+        if sources:
+            self.not_modified_ratio = (
+                SMOOTHING * not_modified / sources +
+                (1 - SMOOTHING) * self.not_modified_ratio)
+
+        if new_jobs:
+            interval = self.interval / (1 + new_jobs)
+        elif pending:
+            interval = self.interval
+        else:
+            interval = self.interval * (1.5 + self.not_modified_ratio / 2)
+
+        self.interval = self.clamp(interval)
+        logging.info('Next poll in {} seconds ({} new jobs, {} pending, '
+                     '{:.2f} not modified)'.format(self.interval, new_jobs,
+                                                   pending,
+                                                   self.not_modified_ratio))
+        return self.interval
+
+    def json(self):
+        """Return the poll metrics and source validators"""
+
+        return {'poll_interval': self.interval,
+                'poll_floor': self.floor,
+                'poll_ceiling': self.ceiling,
+                'new_jobs': self.new_jobs,
+                'pending': self.pending,
+                'not_modified_ratio': round(self.not_modified_ratio, 4),
+                'validators': self.validators}
+
+    def load(self, filename):
+        """Resume from the state published by the previous cycle"""
+
+        try:
+            with open(filename, 'r') as f:
+                state = json.load(f)
+
+        except (IOError, ValueError):
+            return
+
+        self.interval = self.clamp(state.get('poll_interval', self.interval))
+        self.not_modified_ratio = state.get('not_modified_ratio', 0.0)
+        self.validators = state.get('validators', {})
+
+    def save(self, filename):
+        """Publish the poll metrics for run.sh and monitoring"""
+
+        try:
+            with open(filename, 'w') as f:
+                json.dump(self.json(), f)
+
+        except IOError as e:
+            logging.error('I/O error({}): {}'.format(e.errno, e.strerror))
@@ -0,0 +1,48 @@
+import os
+import tempfile
+import unittest
+from poller import AdaptivePoller
+
+
+class AdaptivePollerTestsCase(unittest.TestCase):
+
+    def test_new_jobs_shorten_interval(self):
+        poller = AdaptivePoller(floor=10, ceiling=300, interval=60)
+        self.assertEqual(poller.update(1, 0, 1, 0), 30)
+        self.assertEqual(poller.update(5, 0, 1, 0), 10)
+
+    def test_pending_holds_interval(self):
+        poller = AdaptivePoller(floor=10, ceiling=300, interval=60)
+        self.assertEqual(poller.update(0, 0, 1, 3), 60)
+
+    def test_quiet_lengthens_interval(self):
+        poller = AdaptivePoller(floor=10, ceiling=300, interval=60)
+        self.assertEqual(poller.update(0, 0, 1, 0), 90)
+        unchanged = AdaptivePoller(floor=10, ceiling=300, interval=60)
+        self.assertGreater(unchanged.update(0, 1, 1, 0), 90)
+        for i in range(10):
+            unchanged.update(0, 1, 1, 0)
+        self.assertEqual(unchanged.interval, 300)
+
+    def test_invalid_bounds(self):
+        with self.assertRaisesRegexp(Exception, 'above ceiling'):
+            AdaptivePoller(floor=60, ceiling=10)
+
+    def test_save_load(self):
+        fd, filename = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            poller = AdaptivePoller(interval=60)
+            poller.validators = {'http://zuul': {'etag': '"v1"'}}
+            poller.update(0, 1, 1, 0)
+            poller.save(filename)
+            loaded = AdaptivePoller()
+            loaded.load(filename)
+            self.assertEqual(loaded.interval, poller.interval)
+            self.assertEqual(loaded.validators, poller.validators)
+            self.assertEqual(loaded.json()['poll_interval'], poller.interval)
+        finally:
+            os.remove(filename)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,5 +5,7 @@ do
     python coverageindex.py
     cp links.json /var/www/html/cover
     scp links.json ronaldbradford.com:/var/www/ronaldbradford/demo/www/cover
-    sleep 60
+    # The indexer adapts the poll interval to the rate of change
+    INTERVAL=$(python -c "import json; print json.load(open('links.json.poll'))['poll_interval']" 2>/dev/null)
+    sleep ${INTERVAL:-60}
 done
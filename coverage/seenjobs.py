@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from collections import OrderedDict
+import logging
+import pickle
+import time
+
+
+MAX_ENTRIES = 20000
+MAX_SECONDS = 60 * 60 * 24  # 1 day
+
+
+class SeenJobs(object):
+    """A bounded record of Zuul job UUIDs already processed
+
+    Entries are kept in the order they were last seen, so both the
+    size bound and the age bound evict from the oldest end. The UUIDs
+    seen in the current status snapshot are also tracked so pending
+    links for jobs that are still running are not purged.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_seconds=MAX_SECONDS):
+        """Seen jobs class initialization"""
+
+        self.max_entries = max_entries
+        self.max_seconds = max_seconds
+        self.jobs = OrderedDict()
+        self.current = set()
+        self.previous = set()
+
+    def __contains__(self, uuid):
+        return uuid in self.jobs
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def begin(self):
+        """Start a new status snapshot"""
+
+        self.current = set()
+
+    def carry_over(self):
+        """Treat the jobs of the previous snapshot as still current, for
+        status sources that were not modified since
+        """
+
+        self.current |= self.previous
+
+    def add(self, uuid, now=None):
+        """Record a job UUID, returning True if it was not already seen"""
+
+        self.current.add(uuid)
+        new = self.jobs.pop(uuid, None) is None
+        self.jobs[uuid] = int(now if now is not None else time.time())
+        if len(self.jobs) > self.max_entries:
+            self.jobs.popitem(last=False)
+
+        return new
+
+    def evict(self, now=None):
+        """Remove entries older than the configured age"""
+
+        cutoff = int(now if now is not None else time.time()) - \
+            self.max_seconds
+        evicted = 0
+        while self.jobs:
+            uuid = next(iter(self.jobs))
+            if self.jobs[uuid] >= cutoff:
+                break
+            del self.jobs[uuid]
+            evicted += 1
+
+        if evicted:
+            logging.debug('Evicted {} seen jobs'.format(evicted))
+
+        return evicted
+
+    def load(self, filename):
+        """Load previously seen jobs from the provided filename"""
+
+        try:
+            with open(filename, 'rb') as fo:
+                jobs, current = pickle.load(fo)
+
+        except (IOError, EOFError, ValueError, pickle.UnpicklingError):
+            return
+
+        self.previous = set(current)
+        for uuid, seen in jobs:
+            self.jobs[uuid] = seen
+        while len(self.jobs) > self.max_entries:
+            self.jobs.popitem(last=False)
+
+        logging.info('Loaded {} seen jobs'.format(len(self.jobs)))
+
+    def save(self, filename):
+        """Persist the seen jobs to the provided filename"""
+
+        try:
+            with open(filename, 'wb') as fo:
+                pickle.dump((list(self.jobs.items()), list(self.current)),
+                            fo, pickle.HIGHEST_PROTOCOL)
+
+        except IOError as e:
+            logging.error('I/O error({}): {}'.format(e.errno, e.strerror))
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+from seenjobs import SeenJobs
+
+
+class SeenJobsTestsCase(unittest.TestCase):
+
+    def test_add(self):
+        seen = SeenJobs()
+        self.assertTrue(seen.add('a'))
+        self.assertFalse(seen.add('a'))
+        self.assertIn('a', seen)
+        self.assertNotIn('b', seen)
+        self.assertEqual(seen.current, set(['a']))
+        seen.begin()
+        self.assertEqual(seen.current, set())
+        self.assertIn('a', seen)
+
+    def test_max_entries(self):
+        seen = SeenJobs(max_entries=2)
+        seen.add('a')
+        seen.add('b')
+        seen.add('a')
+        seen.add('c')
+        self.assertEqual(len(seen), 2)
+        self.assertNotIn('b', seen)
+        self.assertIn('a', seen)
+
+    def test_evict(self):
+        seen = SeenJobs(max_seconds=10)
+        seen.add('a', now=100)
+        seen.add('b', now=105)
+        self.assertEqual(seen.evict(now=112), 1)
+        self.assertNotIn('a', seen)
+        self.assertIn('b', seen)
+
+    def test_save_load(self):
+        fd, filename = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            seen = SeenJobs()
+            seen.add('a')
+            seen.add('b')
+            seen.save(filename)
+            loaded = SeenJobs()
+            loaded.load(filename)
+            self.assertEqual(list(loaded.jobs), ['a', 'b'])
+            self.assertEqual(loaded.current, set())
+            self.assertEqual(loaded.previous, set(['a', 'b']))
+            loaded.carry_over()
+            self.assertEqual(loaded.current, set(['a', 'b']))
+        finally:
+            os.remove(filename)
+
+    def test_load_missing(self):
+        seen = SeenJobs()
+        seen.load(os.path.join(tempfile.gettempdir(), 'does.not.exist'))
+        self.assertEqual(len(seen), 0)
+
+if __name__ == '__main__':
+    unittest.main()
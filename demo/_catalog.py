@@ -0,0 +1,234 @@
+# Copyright (c) 2015 OpenStack Foundation
+# All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+"""A precompiled, memory-mapped index of the demo translation catalogs.
+
+The gettext catalogs (.mo files) of a domain and its log level domains,
+for every language in a locale directory, are compiled into one file:
+
+  $ python -m demo._catalog /path/to/locale demo.idx
+
+Worker processes then map the same file read-only instead of each
+loading every catalog into its own dictionaries, so the pages are shared
+between processes and nothing is parsed at start up.
+
+The index is a header, a table of entries sorted by key and the string
+data. Keys are "language NUL domain NUL msgid" and values the translated
+message, both UTF-8 encoded.
+"""
+
+from __future__ import print_function
+
+import gettext
+import mmap
+import os
+import struct
+import sys
+import threading
+
+MAGIC = b'DEMOIDX1'
+_HEADER = struct.Struct('<II')   # entry count, languages length
+_ENTRY = struct.Struct('<IIII')  # key offset/length, value offset/length
+
+
+def _text(value):
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    return value
+
+
+def read_catalogs(localedir, domain):
+    """Return {(language, domain, msgid): msgstr} for the catalogs of the
+    domain and its log level domains found in localedir
+    """
+
+    catalogs = {}
+    for language in sorted(os.listdir(localedir)):
+        messages_dir = os.path.join(localedir, language, 'LC_MESSAGES')
+        if not os.path.isdir(messages_dir):
+            continue
+        for filename in sorted(os.listdir(messages_dir)):
+            name, ext = os.path.splitext(filename)
+            if ext != '.mo' or not (name == domain or
+                                    name.startswith(domain + '-log-')):
+                continue
+            with open(os.path.join(messages_dir, filename), 'rb') as f:
+                translations = gettext.GNUTranslations(f)
+            for msgid, msgstr in translations._catalog.items():
+                # Skip the metadata entry and plural forms
+                if not msgid or isinstance(msgid, tuple):
+                    continue
+                catalogs[(language, name, _text(msgid))] = _text(msgstr)
+    return catalogs
+
+
+def write_mo(path, messages):
+    """Write a minimal GNU .mo file for the {msgid: msgstr} messages"""
+
+    messages = dict(messages)
+    messages[''] = 'Content-Type: text/plain; charset=UTF-8\n'
+    keys = sorted(messages)
+    ids = [key.encode('utf-8') for key in keys]
+    strs = [messages[key].encode('utf-8') for key in keys]
+
+    header = 7 * 4
+    ids_table = header
+    strs_table = ids_table + 8 * len(keys)
+    offset = strs_table + 8 * len(keys)
+    id_entries = []
+    for value in ids:
+        id_entries.append(struct.pack('<II', len(value), offset))
+        offset += len(value) + 1
+    str_entries = []
+    for value in strs:
+        str_entries.append(struct.pack('<II', len(value), offset))
+        offset += len(value) + 1
+
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<7I', 0x950412de, 0, len(keys), ids_table,
+                            strs_table, 0, 0))
+        f.write(b''.join(id_entries))
+        f.write(b''.join(str_entries))
+        for value in ids + strs:
+            f.write(value + b'\0')
+
+
+def compile_index(localedir, domain, output):
+    """Compile the catalogs of the domain in localedir into output"""
+
+    catalogs = read_catalogs(localedir, domain)
+    entries = sorted(('\0'.join(key).encode('utf-8'), value.encode('utf-8'))
+                     for key, value in catalogs.items())
+    languages = b'\0'.join(sorted(set(language.encode('utf-8')
+                                      for language, d, m in catalogs)))
+
+    table = len(MAGIC) + _HEADER.size + len(languages)
+    table += -table % 4
+    offset = table + _ENTRY.size * len(entries)
+
+    index = []
+    data = []
+    for key, value in entries:
+        index.append(_ENTRY.pack(offset, len(key), offset + len(key),
+                                 len(value)))
+        data.append(key)
+        data.append(value)
+        offset += len(key) + len(value)
+
+    tmp = output + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(MAGIC)
+        f.write(_HEADER.pack(len(entries), len(languages)))
+        f.write(languages)
+        f.write(b'\0' * (table - len(MAGIC) - _HEADER.size - len(languages)))
+        f.write(b''.join(index))
+        f.write(b''.join(data))
+    # Replace atomically so workers mapping the old index are unaffected
+    os.rename(tmp, output)
+    return len(entries)
+
+
+class CatalogIndex(object):
+    """A read-only view of a compiled catalog index"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError('%s is not a catalog index' % path)
+
+        self.count, languages_len = _HEADER.unpack_from(self._map,
+                                                        len(MAGIC))
+        start = len(MAGIC) + _HEADER.size
+        languages = self._map[start:start + languages_len]
+        self.languages = [_text(language)
+                          for language in languages.split(b'\0')
+                          if language]
+        self._table = start + languages_len + (-(start + languages_len) % 4)
+
+    def _lookup(self, key):
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key_off, key_len, value_off, value_len = _ENTRY.unpack_from(
+                self._map, self._table + mid * _ENTRY.size)
+            found = self._map[key_off:key_off + key_len]
+            if found < key:
+                lo = mid + 1
+            elif found > key:
+                hi = mid
+            else:
+                return self._map[value_off:value_off + value_len]
+        return None
+
+    def gettext(self, language, domain, msgid):
+        """Return the translated msgid, or None when not translated"""
+
+        value = self._lookup('\0'.join((language, domain, msgid))
+                             .encode('utf-8'))
+        if value is None:
+            return None
+        return value.decode('utf-8')
+
+    def translator(self, domain, languages):
+        """Return a function translating a msgid of the domain into the
+        first of the languages it has a translation for
+        """
+
+        languages = [language for language in languages
+                     if language in self.languages]
+
+        def translate(msg):
+            for language in languages:
+                translated = self.gettext(language, domain, msg)
+                if translated is not None:
+                    return translated
+            return msg
+
+        return translate
+
+    def close(self):
+        self._map.close()
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def open_index(path):
+    """Return the CatalogIndex for path, mapping it once per process"""
+
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = _indexes[path] = CatalogIndex(path)
+        return index
+
+
+def forget_indexes():
+    """Map the index files again on next use, such as after a rebuild"""
+
+    with _indexes_lock:
+        _indexes.clear()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) not in (3, 4):
+        print('usage: python -m demo._catalog LOCALEDIR OUTPUT [DOMAIN]')
+        sys.exit(1)
+    count = compile_index(sys.argv[1],
+                          sys.argv[3] if len(sys.argv) > 3 else 'demo',
+                          sys.argv[2])
+    print('Compiled %d messages into %s' % (count, sys.argv[2]))
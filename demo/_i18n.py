@@ -19,14 +19,124 @@
    See  http://docs.openstack.org/developer/oslo.i18n/usage.html
 """
 
+import collections
+import functools
+import os
+import sys
+import threading
+
 import oslo_i18n
 
+from demo import _catalog
+
 DOMAIN = "demo"
 
+# The same variables oslo.i18n and the catalog build step use
+LOCALEDIR_ENV = DOMAIN.upper() + '_LOCALEDIR'
+CATALOG_INDEX_ENV = DOMAIN.upper() + '_CATALOG_INDEX'
+
+# Maximum number of message IDs kept for each translator
+CACHE_SIZE = 1024
+
 _translators = oslo_i18n.TranslatorFactory(domain=DOMAIN)
 
+
+def _lru_cache_py27(maxsize):
+    """A minimal functools.lru_cache for Python 2.7"""
+
+    def decorator(func):
+        entries = collections.OrderedDict()
+        stats = [0, 0]
+        lock = threading.Lock()
+
+        def wrapper(key):
+            with lock:
+                try:
+                    value = entries.pop(key)
+                except KeyError:
+                    stats[1] += 1
+                else:
+                    entries[key] = value
+                    stats[0] += 1
+                    return value
+            value = func(key)
+            with lock:
+                entries[key] = value
+                if len(entries) > maxsize:
+                    entries.popitem(last=False)
+            return value
+
+        def cache_info():
+            return stats[0], stats[1], maxsize, len(entries)
+
+        wrapper.cache_info = cache_info
+        return wrapper
+
+    return decorator
+
+
+_lru_cache = getattr(functools, 'lru_cache', _lru_cache_py27)
+
+
+def _language():
+    # The same environment variables gettext uses to pick the catalog
+    for name in ('LANGUAGE', 'LC_ALL', 'LC_MESSAGES', 'LANG'):
+        value = os.environ.get(name)
+        if value:
+            return value
+    return 'C'
+
+
+def _index_languages(language):
+    # The catalog directory names to try for a gettext language value,
+    # e.g. "de_DE.UTF-8" is looked up as "de_DE" and then "de"
+    languages = []
+    for value in language.split(':'):
+        value = value.split('.')[0].split('@')[0]
+        for candidate in (value, value.split('_')[0]):
+            if candidate and candidate not in languages:
+                languages.append(candidate)
+    return languages
+
+
+def _translator(name, domain):
+    """Return one of the TranslatorFactory translation functions
+
+    With lazy translation enabled, each call builds a Message, which is
+    only translated to the requested language when emitted, so one is
+    kept per message ID in a bounded LRU. Otherwise the function is the
+    TranslatorFactory one, a gettext lookup in the catalog of the
+    language set when it was created, which a cache would only slow
+    down.
+
+    When a compiled catalog index is set in the environment it is used
+    instead of the oslo.i18n catalogs. Lookups through the index always
+    return translated strings, so do not set it when enabling lazy
+    translation.
+    """
+
+    index_path = os.environ.get(CATALOG_INDEX_ENV)
+    if index_path:
+        index = _catalog.open_index(index_path)
+        return index.translator(domain, _index_languages(_language()))
+    translate = getattr(_translators, name)
+    if oslo_i18n._lazy.USE_LAZY:
+        return _lru_cache(CACHE_SIZE)(translate)
+    return translate
+
+
+# The TranslatorFactory name and domain of each translator below,
+# created again by clear_cache()
+_TRANSLATORS = {
+    '_': ('primary', DOMAIN),
+    '_LI': ('log_info', DOMAIN + '-log-info'),
+    '_LW': ('log_warning', DOMAIN + '-log-warning'),
+    '_LE': ('log_error', DOMAIN + '-log-error'),
+    '_LC': ('log_critical', DOMAIN + '-log-critical'),
+}
+
 # The primary translation function using the well-known name "_"
-_ = _translators.primary
+_ = _translator(*_TRANSLATORS['_'])
 
 # The contextual translation function using the name "_C"
 _C = _translators.contextual_form
@@ -39,11 +149,147 @@ _P = _translators.plural_form
 # The abbreviated names are meant to reflect the usual use of a short
 # name like '_'. The "L" is for "log" and the other letter comes from
 # the level.
-_LI = _translators.log_info
-_LW = _translators.log_warning
-_LE = _translators.log_error
-_LC = _translators.log_critical
+_LI = _translator(*_TRANSLATORS['_LI'])
+_LW = _translator(*_TRANSLATORS['_LW'])
+_LE = _translator(*_TRANSLATORS['_LE'])
+_LC = _translator(*_TRANSLATORS['_LC'])
+
+
+def _translate(name, msg):
+    # Through the module attribute, which clear_cache() replaces
+    return globals()[name](msg)
+
+
+class _DeferredMessage(object):
+    """A log message translated, and interpolated, only when emitted
+
+    Logging only converts the message to a string once a record passes
+    the level check, so a filtered out call never translates.
+    """
+
+    __slots__ = ('_translate', '_msg', '_args')
+
+    def __init__(self, translate, msg, args=None):
+        self._translate = translate
+        self._msg = msg
+        self._args = args
+
+    def __mod__(self, args):
+        return _DeferredMessage(self._translate, self._msg, args)
+
+    def __unicode__(self):
+        translated = self._translate(self._msg)
+        if self._args is None:
+            return translated
+        return translated % self._args
+
+    if sys.version_info[0] >= 3:
+        __str__ = __unicode__
+    else:
+        def __str__(self):
+            return self.__unicode__().encode('utf-8')
+
+    def __repr__(self):
+        return '<%s %r>' % (self.__class__.__name__, self._msg)
+
+
+class _DeferredTranslator(dict):
+    """Return deferred messages for one of the log level translators
+
+    Without arguments a deferred message is immutable, so one is kept
+    per message ID and calls are plain dict lookups.
+    """
+
+    def __init__(self, name):
+        super(_DeferredTranslator, self).__init__()
+        self._translate = functools.partial(_translate, name)
+
+    __call__ = dict.__getitem__
+
+    def __missing__(self, msg):
+        if len(self) >= CACHE_SIZE:
+            self.clear()
+        deferred = self[msg] = _DeferredMessage(self._translate, msg)
+        return deferred
+
+
+# Deferred translators for log levels.
+#
+# The "D" is for "deferred". Use these with delayed interpolation
+# (i.e. LOG.info(_DLI("msg %s"), var)) and the translation only happens
+# when the record is emitted.
+_DLI = _DeferredTranslator('_LI')
+_DLW = _DeferredTranslator('_LW')
+_DLE = _DeferredTranslator('_LE')
+_DLC = _DeferredTranslator('_LC')
+
+
+def clear_cache():
+    """Forget cached translations and create the translators again
+
+    Call this when the catalogs on disk or the language in the
+    environment change, or after enabling lazy translation with
+    oslo_i18n.enable_lazy(). Modules which imported the translators
+    keep the previous ones, so enable lazy translation before they are
+    imported.
+    """
+
+    _catalog.forget_indexes()
+    _languages_cache.clear()
+    for attr, (name, domain) in _TRANSLATORS.items():
+        globals()[attr] = _translator(name, domain)
+
+
+_languages_cache = {}
+
+
+def _locale_mtimes(localedir, names):
+    # The modification times which change when a catalog is added to or
+    # removed from one of the language directories
+    mtimes = []
+    for name in names:
+        for path in (os.path.join(localedir, name),
+                     os.path.join(localedir, name, 'LC_MESSAGES')):
+            try:
+                mtimes.append(os.stat(path).st_mtime)
+            except OSError:
+                mtimes.append(None)
+    return mtimes
 
 
 def get_available_languages():
-    return oslo_i18n.get_available_languages(DOMAIN)
+    """Return the languages the demo domain has catalogs for
+
+    oslo.i18n probes every known locale once per process and never looks
+    again. When the locale directory is set, it is listed instead and
+    the result kept until the modification time of the directory, or of
+    a language or LC_MESSAGES directory in it, changes, such as when a
+    catalog is added or removed.
+    """
+
+    localedir = os.environ.get(LOCALEDIR_ENV)
+    if not localedir:
+        return oslo_i18n.get_available_languages(DOMAIN)
+
+    try:
+        mtime = os.stat(localedir).st_mtime
+    except OSError:
+        return ['en_US']
+
+    cached = _languages_cache.get(localedir)
+    if (cached and cached[0] == mtime and
+            cached[2] == _locale_mtimes(localedir, cached[1])):
+        return list(cached[3])
+
+    names = sorted(os.listdir(localedir))
+    # Taken before looking for the catalogs, so a catalog added while
+    # looking is found by the next call
+    mtimes = _locale_mtimes(localedir, names)
+    # en_US is always available as the default, as with oslo.i18n
+    languages = ['en_US']
+    for language in names:
+        mo = os.path.join(localedir, language, 'LC_MESSAGES', DOMAIN + '.mo')
+        if language not in languages and os.path.exists(mo):
+            languages.append(language)
+    _languages_cache[localedir] = (mtime, names, mtimes, languages)
+    return list(languages)
@@ -0,0 +1,247 @@
+# Copyright (c) 2015 OpenStack Foundation
+# All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+"""Check Python sources for the i18n logging guidelines.
+
+  $ python -m demo.checks [--jobs N] [--cache FILE] PATH [PATH ...]
+
+The guidelines demonstrated in usage_oslo_i18n.py are checked:
+
+D701  interpolation inside a translation function, e.g. _LW("msg %s" % var)
+D702  interpolation of a log message, e.g. LOG.warning(_LW("msg %s") % var)
+D703  LOG.warn is deprecated, use LOG.warning
+D704  a tuple as the log message argument, e.g. LOG.warning(msg, (a, b))
+
+Files are parsed across a process pool and the results are cached by
+content hash, so only files that changed since the last run are parsed
+again.
+
+See http://docs.openstack.org/developer/oslo.i18n/guidelines.html
+"""
+
+from __future__ import print_function
+
+import argparse
+import ast
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+
+TRANSLATORS = frozenset(['_', '_LI', '_LW', '_LE', '_LC',
+                         '_DLI', '_DLW', '_DLE', '_DLC'])
+LOGGERS = frozenset(['LOG'])
+LOG_METHODS = frozenset(['debug', 'info', 'warn', 'warning', 'error',
+                         'exception', 'critical'])
+
+CACHE_FILE = '.demo-checks-cache.json'
+# Bump when the checks change so cached results are not reused
+CACHE_VERSION = 1
+
+MESSAGES = {
+    'D701': 'D701 Delay string interpolation, do not interpolate inside %s()',
+    'D702': 'D702 Delay string interpolation, pass the arguments to LOG.%s()',
+    'D703': 'D703 LOG.warn is deprecated, use LOG.warning',
+    'D704': 'D704 Pass the arguments to LOG.%s() individually or as a dict, '
+            'not as a tuple',
+}
+
+
+if hasattr(ast, 'Constant'):
+    def _is_str(node):
+        return isinstance(node, ast.Constant) and isinstance(node.value, str)
+else:  # Python 2.7
+    def _is_str(node):
+        return isinstance(node, ast.Str)
+
+
+def _is_interpolation(node):
+    """Return True for "..." % args and "...".format(args)"""
+
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Mod):
+        return True
+    return (isinstance(node, ast.Call) and
+            isinstance(node.func, ast.Attribute) and
+            node.func.attr == 'format' and _is_str(node.func.value))
+
+
+def _translator(node):
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and
+            node.func.id in TRANSLATORS):
+        return node.func.id
+    return None
+
+
+def _log_method(node):
+    func = node.func
+    if (isinstance(func, ast.Attribute) and func.attr in LOG_METHODS and
+            isinstance(func.value, ast.Name) and func.value.id in LOGGERS):
+        return func.attr
+    return None
+
+
+class _Checker(ast.NodeVisitor):
+
+    def __init__(self):
+        self.errors = []
+
+    def error(self, node, code, *args):
+        self.errors.append((node.lineno, node.col_offset,
+                            MESSAGES[code] % args if args else MESSAGES[code]))
+
+    def visit_Call(self, node):
+        translator = _translator(node)
+        if translator and node.args and _is_interpolation(node.args[0]):
+            self.error(node, 'D701', translator)
+
+        method = _log_method(node)
+        if method:
+            if method == 'warn':
+                self.error(node, 'D703')
+            if node.args:
+                msg = node.args[0]
+                # Interpolating a translated or literal message
+                if _is_interpolation(msg) and (
+                        _translator(getattr(msg, 'left', None)) or
+                        _is_str(getattr(msg, 'left', None))):
+                    self.error(node, 'D702', method)
+            if len(node.args) == 2 and isinstance(node.args[1], ast.Tuple):
+                self.error(node, 'D704', method)
+
+        self.generic_visit(node)
+
+
+def check_source(source, filename='<unknown>'):
+    """Return a sorted list of (line, column, message) for the source"""
+
+    try:
+        tree = ast.parse(source, filename)
+    except SyntaxError as e:
+        return [(e.lineno or 0, e.offset or 0,
+                 'D700 Unable to parse: %s' % e.msg)]
+    checker = _Checker()
+    checker.visit(tree)
+    return sorted(checker.errors)
+
+
+def _check_file(item):
+    path, digest, source = item
+    return digest, check_source(source, path)
+
+
+def find_sources(paths):
+    for path in paths:
+        if os.path.isfile(path):
+            yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if not d.startswith('.') and
+                             d not in ('.tox', '__pycache__'))
+            for name in sorted(files):
+                if name.endswith('.py'):
+                    yield os.path.join(root, name)
+
+
+def _load_cache(filename):
+    try:
+        with open(filename) as f:
+            cache = json.load(f)
+    except (IOError, ValueError):
+        return {}
+    if cache.get('version') != CACHE_VERSION:
+        return {}
+    return cache.get('results', {})
+
+
+def _save_cache(filename, results):
+    try:
+        with open(filename, 'w') as f:
+            json.dump({'version': CACHE_VERSION, 'results': results}, f)
+    except IOError as e:
+        print('Unable to save cache %s: %s' % (filename, e), file=sys.stderr)
+
+
+def check_paths(paths, jobs=None, cache_file=CACHE_FILE):
+    """Check the Python files in paths, returning {path: errors}
+
+    Only files whose content hash is not in the cache are parsed, on a
+    pool of jobs processes. The cache is rewritten with the results for
+    the files checked in this run.
+    """
+
+    cache = _load_cache(cache_file) if cache_file else {}
+    results = {}
+    digests = {}
+    todo = []
+    for path in find_sources(paths):
+        with open(path, 'rb') as f:
+            source = f.read()
+        digest = hashlib.sha1(source).hexdigest()
+        digests[path] = digest
+        if digest in cache:
+            results[digest] = cache[digest]
+        elif digest not in results:
+            results[digest] = None
+            todo.append((path, digest, source))
+
+    if len(todo) > 1 and jobs != 1:
+        pool = multiprocessing.Pool(jobs)
+        try:
+            checked = pool.map(_check_file, todo,
+                               chunksize=max(1, len(todo) // (4 * (
+                                   jobs or multiprocessing.cpu_count()))))
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        checked = [_check_file(item) for item in todo]
+
+    for digest, errors in checked:
+        # JSON has no tuples, so keep cached and new results alike
+        results[digest] = [list(error) for error in errors]
+
+    if cache_file:
+        _save_cache(cache_file, results)
+
+    return dict((path, results[digest]) for path, digest in digests.items())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='\n'.join(__doc__.splitlines()[6:10]))
+    parser.add_argument('paths', nargs='+', help='Files or directories')
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                        help='Number of processes (default: CPU count)')
+    parser.add_argument('--cache', default=CACHE_FILE,
+                        help='Results cache file (default: %(default)s)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Do not read or write the results cache')
+    args = parser.parse_args(argv)
+
+    results = check_paths(args.paths, args.jobs,
+                          None if args.no_cache else args.cache)
+    count = 0
+    for path in sorted(results):
+        for line, column, message in results[path]:
+            print('%s:%d:%d: %s' % (path, line, column + 1, message))
+            count += 1
+    return 1 if count else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,337 @@
+# Copyright (c) 2016 OpenStack Foundation
+# All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+"""Index and compare the options of oslo-config-generator samples.
+
+  $ python -m demo.confsample [--cache DIR] OLD.conf.sample NEW.conf.sample
+
+A sample such as review/274270/keystone.conf.sample is read in one pass
+into an index of section -> option -> Option(default, type, range,
+allowed, deprecated, help_crc, help), where range is (minimum, maximum)
+and help is the (first, last) line span of the help text, or (None,
+None) without help. The default of a multi valued option written with
+one line per value is the tuple of the values.
+
+The two samples are compared option by option, reporting the options
+added or removed and the fields that changed, rather than a text diff
+where every reflowed help line shows up. Indexes are cached by content
+hash, in this process and as one file per hash in the cache directory,
+so a sample is only parsed again when it changed and a run only loads
+the indexes of the samples it compares.
+"""
+
+from __future__ import print_function
+
+import argparse
+import collections
+import hashlib
+import json
+import os
+import re
+import sys
+import zlib
+
+CACHE_DIR = '.demo-confsample-cache'
+# Bump when the index changes so cached indexes are not reused
+CACHE_VERSION = 3
+# The most recently used indexes kept in the cache directory
+CACHE_ENTRIES = 100
+
+Option = collections.namedtuple(
+    'Option', 'default type range allowed deprecated help_crc help')
+
+# Compared by diff; the help span moves whenever lines above it change
+FIELDS = ('default', 'type', 'range', 'allowed', 'deprecated', 'help')
+
+_OPTION = re.compile(r'#([\w.-]+) =(?: (.*))?$')
+_TYPE = re.compile(r'\s*\(([A-Za-z ]+) valued?\)$')
+
+_indexes = {}
+
+
+class _Pending(object):
+    """The comment block read so far for the next option"""
+
+    def __init__(self):
+        self.start = None
+        self.end = None
+        self.help = []
+        self.minimum = None
+        self.maximum = None
+        self.allowed = None
+        self.deprecated = []
+        self.reason = None
+
+    def comment(self, lineno, text):
+        if not text:
+            # A paragraph break, kept inside the help text only
+            if self.start is not None and self.reason is None:
+                self.help.append(text)
+        elif text.startswith('Minimum value: '):
+            self.minimum = text[15:]
+        elif text.startswith('Maximum value: '):
+            self.maximum = text[15:]
+        elif text.startswith('Allowed values: '):
+            self.allowed = tuple(text[16:].split(', '))
+        elif text.startswith('Deprecated group/name - '):
+            self.deprecated.append(text[24:])
+        elif text.startswith('This option is deprecated for removal'):
+            self.reason = []
+        elif text.startswith('Its value may be silently ignored'):
+            pass
+        elif self.reason is not None:
+            self.reason.append(text)
+        else:
+            if self.start is None:
+                self.start = lineno
+            self.end = lineno
+            self.help.append(text)
+
+    def option(self, default):
+        text = ' '.join(self.help).strip()
+        match = _TYPE.search(text)
+        opt_type = None
+        if match:
+            opt_type = match.group(1)
+            text = text[:match.start()]
+        opt_range = None
+        if self.minimum is not None or self.maximum is not None:
+            opt_range = (self.minimum, self.maximum)
+        deprecated = self.deprecated
+        if self.reason is not None:
+            deprecated = deprecated + [
+                ' '.join(['For removal.'] + self.reason)]
+        return Option(default, opt_type, opt_range, self.allowed,
+                      tuple(deprecated),
+                      zlib.crc32(text.encode('utf-8')) & 0xffffffff,
+                      (self.start, self.end))
+
+
+def parse(lines):
+    """Return the index of the sample lines, read in one pass"""
+
+    index = {}
+    section = index.setdefault('DEFAULT', {})
+    pending = _Pending()
+    header = False
+    # The line number of a '#' line, which heads the options of a library
+    # when followed by '# From <namespace>' and '#', and is otherwise an
+    # empty line of the help text
+    bare = None
+    # The option of the previous line, repeated for each default of a
+    # multi valued option
+    last = None
+    for lineno, line in enumerate(lines, 1):
+        line = line.rstrip()
+        if bare is not None:
+            if line.startswith('# From '):
+                pending = _Pending()
+                header = True
+                bare = None
+                continue
+            pending.comment(bare, '')
+            bare = None
+        name, last = last, None
+        if not line:
+            pending = _Pending()
+            header = False
+        elif line[0] == '[' and line[-1] == ']':
+            section = index.setdefault(line[1:-1], {})
+            pending = _Pending()
+        elif header:
+            continue
+        elif line == '#':
+            bare = lineno
+        elif line.startswith('# '):
+            pending.comment(lineno, line[2:])
+        else:
+            match = _OPTION.match(line)
+            if match and match.group(1) == name:
+                opt = section[name]
+                defaults = opt.default
+                if not isinstance(defaults, tuple):
+                    defaults = (defaults,)
+                section[name] = opt._replace(
+                    default=defaults + (match.group(2) or '',))
+                last = name
+            elif match:
+                last = match.group(1)
+                section[last] = pending.option(match.group(2) or '')
+                pending = _Pending()
+    return index
+
+
+def _to_json(index):
+    return dict((section, dict((name, list(opt))
+                               for name, opt in options.items()))
+                for section, options in index.items())
+
+
+def _from_json(data):
+    def option(default, opt_type, opt_range, allowed, deprecated, help_crc,
+               help_span):
+        if isinstance(default, list):
+            default = tuple(default)
+        return Option(default, opt_type,
+                      tuple(opt_range) if opt_range else None,
+                      tuple(allowed) if allowed else None,
+                      tuple(deprecated), help_crc, tuple(help_span))
+
+    return dict((section, dict((name, option(*fields))
+                               for name, fields in options.items()))
+                for section, options in data.items())
+
+
+def _load_cached(cache_dir, digest):
+    path = os.path.join(cache_dir, digest + '.json')
+    try:
+        with open(path) as f:
+            cache = json.load(f)
+    except (IOError, ValueError):
+        return None
+    if cache.get('version') != CACHE_VERSION:
+        return None
+    # Mark it as recently used, so it is pruned last
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+    return _from_json(cache['index'])
+
+
+def _save_cached(cache_dir, digest, index):
+    path = os.path.join(cache_dir, digest + '.json')
+    try:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        with open(path + '.tmp', 'w') as f:
+            json.dump({'version': CACHE_VERSION, 'index': _to_json(index)},
+                      f)
+        os.rename(path + '.tmp', path)
+
+        entries = [os.path.join(cache_dir, name)
+                   for name in os.listdir(cache_dir)
+                   if name.endswith('.json')]
+        if len(entries) > CACHE_ENTRIES:
+            entries.sort(key=os.path.getmtime)
+            for entry in entries[:len(entries) - CACHE_ENTRIES]:
+                os.remove(entry)
+    except (IOError, OSError) as e:
+        print('Unable to save cache %s: %s' % (path, e), file=sys.stderr)
+
+
+def forget_indexes():
+    _indexes.clear()
+
+
+def index_file(filename, cache_dir=None):
+    """Return (content hash, index) of the sample file
+
+    The file is only parsed if no index of the same content was parsed
+    before in this process or, when given, kept in cache_dir.
+    """
+
+    with open(filename, 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha1(data).hexdigest()
+    index = _indexes.get(digest)
+    if index is None and cache_dir:
+        index = _load_cached(cache_dir, digest)
+    if index is None:
+        index = parse(data.decode('utf-8').splitlines())
+        if cache_dir:
+            _save_cached(cache_dir, digest, index)
+    _indexes[digest] = index
+    return digest, index
+
+
+def diff(old, new):
+    """Compare two indexes option by option
+
+    Yields (section, option, field, old value, new value), with field
+    'added' or 'removed' for an option in only one of the indexes.
+    """
+
+    for section in sorted(set(old) | set(new)):
+        old_options = old.get(section, {})
+        new_options = new.get(section, {})
+        for name in sorted(set(old_options) | set(new_options)):
+            old_opt = old_options.get(name)
+            new_opt = new_options.get(name)
+            if old_opt is None:
+                yield section, name, 'added', None, new_opt
+            elif new_opt is None:
+                yield section, name, 'removed', old_opt, None
+            elif old_opt[:-1] != new_opt[:-1]:
+                for field in FIELDS:
+                    if field == 'help':
+                        if old_opt.help_crc != new_opt.help_crc:
+                            yield (section, name, field, old_opt.help,
+                                   new_opt.help)
+                    elif getattr(old_opt, field) != getattr(new_opt, field):
+                        yield (section, name, field, getattr(old_opt, field),
+                               getattr(new_opt, field))
+
+
+def diff_files(old_filename, new_filename, cache_dir=None):
+    """Compare two sample files, returning the list of changes"""
+
+    old_digest, old = index_file(old_filename, cache_dir)
+    new_digest, new = index_file(new_filename, cache_dir)
+    if old_digest == new_digest:
+        return []
+    return list(diff(old, new))
+
+
+def _format_span(span):
+    if span[0] is None:
+        return 'no help'
+    return 'lines %d-%d' % span
+
+
+def format_change(change):
+    section, name, field, old, new = change
+    if field == 'added':
+        return '[%s] %s: added, default %r' % (section, name, new.default)
+    if field == 'removed':
+        return '[%s] %s: removed' % (section, name)
+    if field == 'help':
+        return '[%s] %s: help changed, %s -> %s' % (
+            section, name, _format_span(old), _format_span(new))
+    return '[%s] %s: %s %r -> %r' % (section, name, field, old, new)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='\n'.join(__doc__.splitlines()[2:3]))
+    parser.add_argument('old', help='Old sample file')
+    parser.add_argument('new', help='New sample file')
+    parser.add_argument('--cache', default=CACHE_DIR,
+                        help='Index cache directory (default: %(default)s)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Do not read or write the index cache')
+    args = parser.parse_args(argv)
+
+    changes = diff_files(args.old, args.new,
+                         None if args.no_cache else args.cache)
+    for change in changes:
+        print(format_change(change))
+    return 1 if changes else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,37 @@
+from demo.delattr2 import _UNRECOGNIZED_ARGS_ATTR
+from demo.delattr2 import Parent
+
+
+class Child(Parent):
+    """delattr2.Child with options kept as plain instance attributes
+
+    Parent.parse sets _unrecognized_args with vars(self).setdefault, so
+    the instance needs a __dict__ and cannot use __slots__. Keeping the
+    options in that same __dict__ means reads, writes and deletes are
+    ordinary attribute access, and deleting _unrecognized_args needs no
+    special case. __getattr__ is only called for missing attributes.
+
+    __setattr__ and __delattr__ are deliberately not defined, as either
+    puts a Python call on every attribute write. So deleting a missing
+    option raises the AttributeError of the class rather than the
+    '_Namespace' one, and _cli is a read-only view: assigning it raises
+    AttributeError, where delattr2.Child would store an option named
+    _cli that could not be read back.
+    """
+
+    def __init__(self):
+        pass
+
+    def parse(self):
+        super(Child, self).parse()
+
+    @property
+    def _cli(self):
+        cli = dict(self.__dict__)
+        cli.pop(_UNRECOGNIZED_ARGS_ATTR, None)
+        return cli
+
+    def __getattr__(self, name):
+        # Only called when name is not an instance attribute
+        raise AttributeError(
+            "'_Namespace' object has no attribute '%s'" % name)
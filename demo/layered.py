@@ -0,0 +1,83 @@
+from demo.delattr2 import _UNRECOGNIZED_ARGS_ATTR
+from demo.delattr2 import Parent
+
+
+class Layers(object):
+    """The lower layers of option values shared between namespaces
+
+    The layers (e.g. defaults then config file) are kept by reference,
+    lowest first, and never copied. Lookups use a flattened dict built
+    on first use and invalidated by every write through this object.
+    """
+
+    def __init__(self, *layers):
+        self.layers = list(layers) or [{}]
+        self._flat = None
+
+    def flatten(self):
+        flat = {}
+        for layer in self.layers:
+            flat.update(layer)
+        self._flat = flat
+        return flat
+
+    def set(self, name, value, layer=-1):
+        self.layers[layer][name] = value
+        self._flat = None
+
+    def delete(self, name, layer=-1):
+        del self.layers[layer][name]
+        self._flat = None
+
+    def namespace(self):
+        return Child(self)
+
+
+class Child(Parent):
+    """A copy-on-write namespace over shared Layers (defaults -> config)
+
+    Creating one only keeps a reference to the layers, whatever the
+    number of options. Values set on the namespace (the CLI layer) are
+    plain instance attributes, so they shadow the layers below and cost
+    a plain attribute read; other names fall through __getattr__ to the
+    flattened layers. Deleting an attribute exposes the lower layer
+    value again, and _unrecognized_args set by Parent.parse is an
+    instance attribute like any other CLI value. Deleting a name not set
+    on the namespace raises AttributeError; __delattr__ gives it the
+    '_Namespace' message, at the cost of a slower attribute write.
+    """
+
+    __slots__ = ('_layers',)
+
+    def __init__(self, layers=None):
+        self._layers = layers if layers is not None else Layers()
+
+    def parse(self):
+        super(Child, self).parse()
+
+    @property
+    def _cli(self):
+        cli = dict(self.__dict__)
+        cli.pop(_UNRECOGNIZED_ARGS_ATTR, None)
+        return cli
+
+    def __delattr__(self, name):
+        try:
+            object.__delattr__(self, name)
+        except AttributeError:
+            # Also for a name only set in the layers below, which are
+            # shared and left as they are
+            raise AttributeError(
+                "'_Namespace' object has no attribute '%s'" % name)
+
+    def __getattr__(self, name):
+        # Only called when name is not set on this namespace
+        layers = self._layers
+        flat = layers._flat
+        if flat is None:
+            flat = layers.flatten()
+        try:
+            return flat[name]
+        except KeyError:
+            raise AttributeError(
+                "'_Namespace' object has no attribute '%s'" % name)
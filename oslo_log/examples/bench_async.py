@@ -0,0 +1,141 @@
+# Copyright (c) 2015 OpenStack Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""A benchmark of synchronous and non-blocking Oslo Logging
+
+This example requires the following package to be installed.
+
+$ pip install oslo.log
+
+Each configuration runs in its own process, logging to a temporary
+log file: syntax.prepare() (synchronous) and syntax_async.prepare() with
+each overflow policy. Several threads each log a number of records with
+LOG.info, optionally with a delay added to every write to stand in for
+a slow disk or syslog. The throughput seen by the callers and the
+latency of the LOG.info calls are reported.
+"""
+
+from __future__ import division
+from __future__ import print_function
+
+import argparse
+import json
+import logging as py_logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from oslo_config import cfg
+from oslo_log import log as logging
+
+import latency
+
+LOG = logging.getLogger(__name__)
+CONF = cfg.CONF
+
+MODES = ['sync', 'block', 'drop', 'count']
+
+
+def slow_down(handlers, delay):
+    # Stand in for slow I/O by delaying every write of the handlers
+    for handler in handlers:
+        emit = handler.emit
+
+        def slow_emit(record, emit=emit):
+            time.sleep(delay)
+            emit(record)
+
+        handler.emit = slow_emit
+
+
+def run(mode, threads, records, queue_size, delay, log_file):
+    """Log from several threads and report the caller side costs"""
+
+    logging.register_options(CONF)
+    CONF.set_override('log_file', log_file)
+    CONF.set_override('use_stderr', False)
+
+    if mode == 'sync':
+        import syntax
+        syntax.prepare()
+        handlers = py_logging.getLogger().handlers
+    else:
+        import syntax_async
+        syntax_async.prepare(queue_size, mode)
+        # The handlers configured by logging.setup are behind the queue
+        handlers = syntax_async._listener.handlers
+    if delay:
+        slow_down(handlers, delay)
+
+    result = latency.measure(
+        lambda i: LOG.info("Benchmark record %d of %d", i, records),
+        threads, records)
+
+    start = time.time()
+    if mode != 'sync':
+        syntax_async.shutdown()
+    flush = time.time() - start
+
+    result['flush_seconds'] = flush
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=4,
+                        help='Number of logging threads')
+    parser.add_argument('--records', type=int, default=5000,
+                        help='Number of records per thread')
+    parser.add_argument('--queue-size', type=int, default=1000,
+                        help='Bound of the non-blocking queue')
+    parser.add_argument('--io-delay', type=float, default=0.0,
+                        help='Seconds added to every handler write')
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('--log-file', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run(args.mode, args.threads, args.records, args.queue_size,
+            args.io_delay, args.log_file)
+        return
+
+    print('%-6s %12s %10s %10s %10s %10s %9s %9s' % (
+          'mode', 'records/s', 'p50 us', 'p99 us', 'p99.9 us', 'max us',
+          'flush s', 'written'))
+    for mode in MODES:
+        fd, log_file = tempfile.mkstemp(suffix='.log')
+        os.close(fd)
+        try:
+            output = subprocess.check_output(
+                [sys.executable, os.path.abspath(__file__), '--mode', mode,
+                 '--threads', str(args.threads),
+                 '--records', str(args.records),
+                 '--queue-size', str(args.queue_size),
+                 '--io-delay', str(args.io_delay), '--log-file', log_file],
+                cwd=os.path.dirname(os.path.abspath(__file__)))
+            result = json.loads(output.decode('utf-8').splitlines()[-1])
+            with open(log_file) as f:
+                written = sum(1 for line in f if 'Benchmark record' in line)
+        finally:
+            os.remove(log_file)
+        print('%-6s %12.0f %10.1f %10.1f %10.1f %10.1f %9.3f %9d' % (
+              mode, result['records_per_second'], result['p50_us'],
+              result['p99_us'], result['p999_us'], result['max_us'],
+              result['flush_seconds'], written))
+
+
+if __name__ == '__main__':
+    main()
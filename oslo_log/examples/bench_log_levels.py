@@ -0,0 +1,126 @@
+# Copyright (c) 2015 OpenStack Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""A benchmark of logger level resolution from default_log_levels
+
+Hundreds of 'pkg=LEVEL' entries are applied the way logging.setup does
+(a logger.setLevel per entry), then the effective level of deep logger
+names is resolved by climbing the logger hierarchy, with a LogLevelTrie
+and after LogLevelTrie.apply() has set the levels on the loggers.
+
+Only the Python standard library is needed to run this benchmark.
+"""
+
+from __future__ import division
+from __future__ import print_function
+
+import argparse
+import logging as py_logging
+import random
+import timeit
+
+import log_levels
+
+LEVELS = ['DEBUG', 'INFO', 'WARN', 'ERROR', 'CRITICAL']
+
+
+def make_entries(count, rng):
+    entries = []
+    for i in range(count):
+        name = 'pkg%d' % (i % 50)
+        # Some entries configure a sub-package of an earlier entry
+        for depth in range(rng.randint(0, 3)):
+            name += '.mod%d' % rng.randint(0, 5)
+        entries.append('%s=%s' % (name, rng.choice(LEVELS)))
+    return entries
+
+
+def make_names(count, depth, rng):
+    names = []
+    for i in range(count):
+        parts = ['pkg%d' % rng.randint(0, 60)]
+        parts += ['mod%d' % rng.randint(0, 5) for j in range(depth - 1)]
+        names.append('.'.join(parts))
+    return names
+
+
+def per_call_ns(func, names, number):
+    def run():
+        for name in names:
+            func(name)
+
+    seconds = min(timeit.repeat(run, number=number, repeat=3))
+    return seconds / (number * len(names)) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entries', type=int, default=500,
+                        help='Number of default_log_levels entries')
+    parser.add_argument('--names', type=int, default=1000,
+                        help='Number of logger names to resolve')
+    parser.add_argument('--depth', type=int, default=10,
+                        help='Number of parts in each logger name')
+    parser.add_argument('--number', type=int, default=20,
+                        help='Iterations over the names per run')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    entries = make_entries(args.entries, rng)
+    names = make_names(args.names, args.depth, rng)
+    root = py_logging.getLogger()
+    root.setLevel(py_logging.WARNING)
+
+    def setup_levels():
+        # As logging.setup applies CONF.default_log_levels
+        for pair in entries:
+            mod, sep, level = pair.partition('=')
+            py_logging.getLogger(mod).setLevel(log_levels.parse_level(level))
+
+    setup_seconds = min(timeit.repeat(setup_levels, number=1, repeat=3))
+    compile_seconds = min(timeit.repeat(
+        lambda: log_levels.LogLevelTrie(entries), number=1, repeat=3))
+    print('%d entries: setLevel each %.2f ms, compile trie %.2f ms' % (
+          len(entries), setup_seconds * 1e3, compile_seconds * 1e3))
+
+    loggers = [py_logging.getLogger(name) for name in names]
+    trie = log_levels.LogLevelTrie(entries)
+    for name, logger in zip(names, loggers):
+        assert trie.resolve(name) == logger.getEffectiveLevel(), name
+
+    by_name = dict(zip(names, loggers))
+    climb = per_call_ns(lambda name: by_name[name].getEffectiveLevel(),
+                        names, args.number)
+    fresh = log_levels.LogLevelTrie(entries)
+    walk = min(timeit.repeat(lambda: [fresh._walk(name) for name in names],
+                             number=1, repeat=3)) / len(names) * 1e9
+    cached = per_call_ns(trie.resolve, names, args.number)
+
+    updated = trie.apply()
+    applied = per_call_ns(lambda name: by_name[name].getEffectiveLevel(),
+                          names, args.number)
+    for name, logger in zip(names, loggers):
+        assert logger.getEffectiveLevel() == trie.resolve(name), name
+
+    print('%d names of depth %d, ns per resolution:' % (len(names),
+                                                        args.depth))
+    print('  %-36s %8.0f' % ('getEffectiveLevel (climb)', climb))
+    print('  %-36s %8.0f' % ('LogLevelTrie walk', walk))
+    print('  %-36s %8.0f' % ('LogLevelTrie resolve (remembered)', cached))
+    print('  %-36s %8.0f' % ('getEffectiveLevel after apply()', applied))
+    print('apply() set the level of %d loggers' % updated)
+
+
+if __name__ == '__main__':
+    main()
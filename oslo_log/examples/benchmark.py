@@ -0,0 +1,182 @@
+# Copyright (c) 2015 OpenStack Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""A log throughput benchmark of the Oslo Logging example configurations
+
+This example requires the following package to be installed.
+
+$ pip install oslo.log
+
+Oslo Logging is prepared with syntax.prepare() and syntax_helper.prepare(),
+each in its own process, writing to a log file (/dev/null by default).
+For every combination of
+
+* formatter: the ContextFormatter configured by logging.setup, or JSON
+* level: an enabled (INFO) record, or one filtered out (DEBUG)
+* exc_info: with or without an exception traceback
+* threads: the number of threads logging at once
+
+records per second and per-record latency are measured. The results are
+written as JSON, and --compare reports the change from an earlier run.
+"""
+
+from __future__ import division
+from __future__ import print_function
+
+import argparse
+import json
+import logging as py_logging
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from oslo_config import cfg
+from oslo_log import formatters
+from oslo_log import log as logging
+
+import latency
+
+LOG = logging.getLogger(__name__)
+CONF = cfg.CONF
+
+PREPARES = ['syntax', 'syntax_helper']
+FORMATTERS = ['context', 'json']
+LEVELS = ['enabled', 'filtered']
+THREADS = [1, 4, 8]
+
+
+def set_formatter(name, context_formatters):
+    for handler, formatter in context_formatters:
+        if name == 'json':
+            formatter = formatters.JSONFormatter()
+        handler.setFormatter(formatter)
+
+
+def measure(level, exc_info, threads, records):
+    """Log records across threads, returning throughput and latency"""
+
+    log = LOG.info if level == 'enabled' else LOG.debug
+    exc = None
+    if exc_info:
+        try:
+            raise ValueError("Benchmark exception")
+        except ValueError:
+            exc = sys.exc_info()
+
+    per_thread = max(1, records // threads)
+    return latency.measure(
+        lambda i: log("Benchmark record %d of %d", i, per_thread,
+                      exc_info=exc),
+        threads, per_thread)
+
+
+def run(prepare, records, threads, log_file):
+    """Prepare Oslo Logging and measure every case in this process"""
+
+    logging.register_options(CONF)
+    CONF.set_override('log_file', log_file)
+    CONF.set_override('use_stderr', False)
+    __import__(prepare).prepare()
+
+    context_formatters = [(handler, handler.formatter)
+                          for handler in py_logging.getLogger().handlers]
+
+    results = []
+    for formatter in FORMATTERS:
+        set_formatter(formatter, context_formatters)
+        for level in LEVELS:
+            for exc_info in (False, True):
+                for count in threads:
+                    result = measure(level, exc_info, count, records)
+                    result.update({'prepare': prepare,
+                                   'formatter': formatter,
+                                   'level': level,
+                                   'exc_info': exc_info,
+                                   'threads': count})
+                    results.append(result)
+    print(json.dumps(results))
+
+
+def key(result):
+    return (result['prepare'], result['formatter'], result['level'],
+            result['exc_info'], result['threads'])
+
+
+def report(results, previous=None):
+    baseline = dict((key(result), result) for result in previous or [])
+    print('%-14s %-8s %-9s %-5s %7s %12s %9s %9s %8s' % (
+          'prepare', 'format', 'level', 'exc', 'threads', 'records/s',
+          'p50 us', 'p99 us', 'change'))
+    for result in results:
+        change = ''
+        old = baseline.get(key(result))
+        if old:
+            change = '%+7.1f%%' % ((result['records_per_second'] /
+                                    old['records_per_second'] - 1) * 100)
+        print('%-14s %-8s %-9s %-5s %7d %12.0f %9.1f %9.1f %8s' % (
+              result['prepare'], result['formatter'], result['level'],
+              result['exc_info'], result['threads'],
+              result['records_per_second'], result['p50_us'],
+              result['p99_us'], change))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--records', type=int, default=20000,
+                        help='Number of records per case')
+    parser.add_argument('--threads', type=int, nargs='+', default=THREADS,
+                        help='Thread counts to measure')
+    parser.add_argument('--log-file', default=os.devnull,
+                        help='Log file to write (default: %(default)s)')
+    parser.add_argument('--output', default='benchmark.json',
+                        help='JSON results file (default: %(default)s)')
+    parser.add_argument('--compare', metavar='JSON',
+                        help='Earlier results file to compare with')
+    parser.add_argument('--prepare', choices=PREPARES,
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.prepare:
+        run(args.prepare, args.records, args.threads, args.log_file)
+        return
+
+    results = []
+    for prepare in PREPARES:
+        output = subprocess.check_output(
+            [sys.executable, os.path.abspath(__file__),
+             '--prepare', prepare, '--records', str(args.records),
+             '--log-file', args.log_file, '--threads'] +
+            [str(count) for count in args.threads],
+            cwd=os.path.dirname(os.path.abspath(__file__)))
+        results += json.loads(output.decode('utf-8').splitlines()[-1])
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)['results']
+
+    with open(args.output, 'w') as f:
+        json.dump({'python': platform.python_version(),
+                   'platform': platform.platform(),
+                   'time': int(time.time()),
+                   'records': args.records,
+                   'results': results}, f, indent=2, sort_keys=True)
+
+    report(results, previous)
+
+
+if __name__ == '__main__':
+    main()
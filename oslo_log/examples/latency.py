@@ -0,0 +1,64 @@
+# Copyright (c) 2015 OpenStack Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""The threaded latency harness of the Oslo Logging benchmarks
+
+Used by benchmark.py and bench_async.py. Only the Python standard
+library is needed.
+"""
+
+from __future__ import division
+
+import threading
+import time
+
+
+def percentile(values, fraction):
+    """Return the fraction percentile of the sorted values"""
+
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def measure(call, threads, calls):
+    """Run call(i) for i in range(calls) on each of threads at once
+
+    Every call is timed. Returns a dict of the throughput and the
+    latency percentiles across all the calls.
+    """
+
+    latencies = [[] for i in range(threads)]
+
+    def work(latency):
+        for i in range(calls):
+            start = time.time()
+            call(i)
+            latency.append(time.time() - start)
+
+    workers = [threading.Thread(target=work, args=(latencies[i],))
+               for i in range(threads)]
+    start = time.time()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.time() - start
+
+    latency = sorted(value for values in latencies for value in values)
+    return {'records': len(latency),
+            'records_per_second': len(latency) / elapsed,
+            'mean_us': sum(latency) / len(latency) * 1e6,
+            'p50_us': percentile(latency, 0.50) * 1e6,
+            'p99_us': percentile(latency, 0.99) * 1e6,
+            'p999_us': percentile(latency, 0.999) * 1e6,
+            'max_us': latency[-1] * 1e6}
@@ -0,0 +1,146 @@
+# Copyright (c) 2015 OpenStack Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Precompiled logger level resolution from default_log_levels
+
+The 'pkg=LEVEL' strings of CONF.default_log_levels (see syntax.py) set
+the level of the named loggers, and every other logger climbs its dotted
+name through the logger hierarchy to find its effective level.
+
+LogLevelTrie compiles the list once into a prefix trie of the dotted
+names, which resolves the configured level of any logger name in one
+walk down the trie, remembered for the next lookup of that name. The
+walk itself is slower than getEffectiveLevel; only the remembered
+lookups are faster (see bench_log_levels.py). apply() sets the resolved
+level on the existing loggers under a configured name, so their level
+checks stop climbing the hierarchy there:
+
+  syntax.prepare()
+  log_levels.LogLevelTrie(CONF.default_log_levels).apply()
+
+Loggers created afterwards still inherit as usual; call apply() again
+once they exist. Levels applied to child loggers no longer follow later
+changes to the level of their configured parent.
+"""
+
+import logging as py_logging
+
+
+def parse_level(name):
+    """Return the numeric level for a level name such as 'WARN'"""
+
+    name = name.strip().upper()
+    if name.isdigit():
+        return int(name)
+    level = py_logging.getLevelName(name)
+    if not isinstance(level, int):
+        raise ValueError('Unknown log level %s' % name)
+    return level
+
+
+class LogLevelTrie(object):
+    """A prefix trie of dotted logger names to their configured level"""
+
+    def __init__(self, default_log_levels, root_level=None):
+        """Compile the 'pkg=LEVEL' list, later entries taking precedence
+
+        Names outside every configured prefix resolve to root_level,
+        which defaults to the level of the root logger.
+        """
+
+        if root_level is None:
+            root_level = py_logging.getLogger().level
+        self.root_level = root_level
+        # Each node is [level or None, {name part: node}]
+        self._root = [None, {}]
+        self._resolved = {}
+
+        for pair in default_log_levels:
+            name, sep, level = pair.partition('=')
+            if not sep:
+                raise ValueError('Invalid default_log_levels entry %s' % pair)
+            node = self._root
+            for part in name.strip().split('.'):
+                node = node[1].setdefault(part, [None, {}])
+            node[0] = parse_level(level)
+
+    def resolve(self, name):
+        """Return the effective level for the dotted logger name"""
+
+        try:
+            return self._resolved[name][0]
+        except KeyError:
+            return self._walk(name)[0]
+
+    def _walk(self, name):
+        # Return (level, number of parts of the longest configured prefix)
+        level = self.root_level
+        matched = 0
+        node = self._root
+        for depth, part in enumerate(name.split('.'), 1):
+            node = node[1].get(part)
+            if node is None:
+                break
+            if node[0] is not None:
+                level = node[0]
+                matched = depth
+
+        self._resolved[name] = (level, matched)
+        return level, matched
+
+    def apply(self, manager=None):
+        """Set the resolved level on the loggers under a configured name
+
+        Loggers named in the list get their configured level, even if
+        already set. A logger without a level gets the level of its
+        longest configured prefix, unless a logger in between has a
+        level of its own, which it keeps inheriting. Loggers outside
+        every configured prefix are left as they are. Returns the number
+        of loggers updated.
+        """
+
+        manager = manager or py_logging.Logger.manager
+        loggers = dict((name, logger) for name, logger
+                       in manager.loggerDict.items()
+                       if isinstance(logger, py_logging.Logger))
+        # The levels set before this call decide which loggers inherit
+        levels = dict((name, logger.level)
+                      for name, logger in loggers.items())
+        updated = 0
+        for name, logger in loggers.items():
+            level, matched = self._resolved.get(name) or self._walk(name)
+            if not matched:
+                continue
+            parts = name.split('.')
+            if matched < len(parts):
+                if logger.level != py_logging.NOTSET:
+                    continue
+                if any(levels.get('.'.join(parts[:depth]),
+                                  py_logging.NOTSET) != py_logging.NOTSET
+                       for depth in range(matched + 1, len(parts))):
+                    continue
+            if logger.level != level:
+                logger.setLevel(level)
+                updated += 1
+        return updated
+
+    def configured(self, name):
+        """Return True if the name itself has a configured level"""
+
+        node = self._root
+        for part in name.split('.'):
+            node = node[1].get(part)
+            if node is None:
+                return False
+        return node[0] is not None
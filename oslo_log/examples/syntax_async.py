@@ -0,0 +1,202 @@
+# Copyright (c) 2015 OpenStack Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""A syntax example of non-blocking Oslo Logging
+
+This example requires the following package to be installed.
+
+$ pip install oslo.log
+
+Oslo Logging is prepared as in syntax.py, then the handlers configured
+by logging.setup are moved behind a bounded queue. LOG calls only put
+the record on the queue, and a background listener thread formats and
+writes it, so callers no longer wait on disk or syslog I/O.
+
+When the queue is full the overflow policy applies:
+
+* block - wait for room on the queue (no record is lost)
+* drop  - discard the record
+* count - discard the record and report how many were discarded
+
+More information about Oslo Logging can be found at:
+
+  http://docs.openstack.org/developer/oslo.log/usage.html
+"""
+
+import atexit
+import logging as py_logging
+import threading
+
+try:
+    import queue
+except ImportError:  # Python 2.7
+    import Queue as queue
+
+from oslo_log import log as logging
+
+try:
+    from oslo_context import context
+except ImportError:
+    context = None
+
+import syntax
+
+LOG = logging.getLogger(__name__)
+
+QUEUE_SIZE = 10000
+OVERFLOW_BLOCK = 'block'
+OVERFLOW_DROP = 'drop'
+OVERFLOW_COUNT = 'count'
+OVERFLOW_POLICIES = (OVERFLOW_BLOCK, OVERFLOW_DROP, OVERFLOW_COUNT)
+
+_listener = None
+
+
+class QueueHandler(py_logging.Handler):
+    """Put records on a bounded queue for a QueueListener to handle"""
+
+    def __init__(self, records, overflow=OVERFLOW_BLOCK):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError('Unknown overflow policy %s' % overflow)
+        py_logging.Handler.__init__(self)
+        self.queue = records
+        self.overflow = overflow
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Interpolate now, as the arguments may change before the
+        # listener gets to the record, and keep the request context
+        # which is only known on the calling thread
+        record.msg = record.getMessage()
+        record.args = None
+        if context is not None and getattr(record, 'context', None) is None:
+            record.context = context.get_current()
+        return record
+
+    def emit(self, record):
+        try:
+            record = self.prepare(record)
+            if self.overflow == OVERFLOW_BLOCK:
+                self.queue.put(record)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+        except Exception:
+            self.handleError(record)
+
+
+class QueueListener(object):
+    """Handle queued records with the given handlers on a thread"""
+
+    _sentinel = None
+
+    def __init__(self, records, handlers):
+        self.queue = records
+        self.handlers = handlers
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._monitor,
+                                        name='oslo-log-queue-listener')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def handle(self, record):
+        for handler in self.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def _monitor(self):
+        while True:
+            record = self.queue.get()
+            if record is self._sentinel:
+                break
+            self.handle(record)
+
+    def stop(self):
+        """Handle every queued record, then stop the thread"""
+
+        if self._thread is None:
+            return
+        self.queue.put(self._sentinel)
+        self._thread.join()
+        self._thread = None
+        for handler in self.handlers:
+            handler.flush()
+
+
+def prepare(queue_size=QUEUE_SIZE, overflow=OVERFLOW_BLOCK):
+    """Prepare Oslo Logging with a queue in front of its handlers
+
+    Use of non-blocking Oslo Logging involves the following:
+
+    * syntax.prepare (logging.register_options, set_defaults and setup)
+    * move the root logger handlers behind a QueueHandler
+    * start a QueueListener thread for those handlers
+    * shutdown (registered with atexit) to flush the queue
+
+    Preparing again first shuts down the listener of the previous call.
+    """
+
+    global _listener
+
+    shutdown()
+    syntax.prepare()
+
+    root = py_logging.getLogger()
+    records = queue.Queue(queue_size)
+    handlers = root.handlers[:]
+    for handler in handlers:
+        root.removeHandler(handler)
+
+    _listener = QueueListener(records, handlers)
+    _listener.start()
+    root.addHandler(QueueHandler(records, overflow))
+
+    atexit.register(shutdown)
+
+
+def shutdown():
+    """Flush queued records and restore the synchronous handlers"""
+
+    global _listener
+
+    if _listener is None:
+        return
+
+    # The handlers are back before the queue handler goes, so records
+    # logged meanwhile by other threads are not lost, though some may
+    # be written twice
+    root = py_logging.getLogger()
+    for handler in _listener.handlers:
+        root.addHandler(handler)
+    dropped = 0
+    for handler in root.handlers[:]:
+        if isinstance(handler, QueueHandler):
+            root.removeHandler(handler)
+            if handler.overflow == OVERFLOW_COUNT:
+                dropped += handler.dropped
+
+    _listener.stop()
+    _listener = None
+
+    if dropped:
+        LOG.warning("Dropped %d log records on a full queue", dropped)
+
+
+if __name__ == '__main__':
+    prepare()
+    LOG.info("Welcome to non-blocking Oslo Logging")
+    shutdown()
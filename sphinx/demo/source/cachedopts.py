@@ -0,0 +1,380 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cached, incremental rendering of the show-options directive.
+
+Add it after oslo_config.sphinxext in the extensions of conf.py:
+
+  extensions = [..., 'oslo_config.sphinxext', 'cachedopts']
+
+When the build starts, the namespaces of every show-options directive
+are found in the sources. A namespace is hashed from its option
+definitions in its own worker process, so the option registrations of
+one namespace never leak into another and the main process imports none
+of them. The worker also records the size and modification time of the
+Python files it had loaded; while none of them changed, the namespace is
+not imported again and keeps its hash.
+
+The reStructuredText rendered by show-options is kept in the doctree
+directory, keyed by the namespaces, the directive options and the hash
+of the option definitions. A document is only read again when the hash
+of one of its namespaces changed, and then only the namespaces that
+changed are rendered again; the others are parsed from the cache.
+
+The time of each build is reported with the number of namespaces
+hashed, rendered and reused, e.g. for a rebuild with no change and one
+after changing the options of a single namespace.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import pickle
+import re
+import sys
+import time
+
+from docutils import nodes
+from docutils.statemachine import ViewList
+from oslo_config import sphinxext
+from sphinx.util.nodes import nested_parse_with_titles
+
+try:
+    from sphinx.util import logging
+    LOG = logging.getLogger(__name__)
+except ImportError:  # Sphinx < 1.6 logs through the application
+    LOG = None
+
+CACHE_FILE = 'cachedopts.pickle'
+# Bump when the cache format changes so cached renders are not reused
+CACHE_VERSION = 2
+
+_DIRECTIVE = re.compile(r'^(\s*)\.\. show-options::(.*)$')
+
+try:
+    _SCALARS = (type(None), bool, int, long, float, str, unicode)
+except NameError:  # Python 3
+    _SCALARS = (type(None), bool, int, float, str, bytes)
+
+
+def _info(app, message):
+    if LOG is not None:
+        LOG.info(message)
+    else:
+        app.info(message)
+
+
+def find_namespaces(srcdir, suffix='.rst'):
+    """Return the namespaces of the show-options directives in srcdir"""
+
+    namespaces = set()
+    for root, dirs, files in os.walk(srcdir):
+        for name in files:
+            if not name.endswith(suffix):
+                continue
+            with open(os.path.join(root, name)) as f:
+                lines = f.read().splitlines()
+            for i, line in enumerate(lines):
+                match = _DIRECTIVE.match(line)
+                if not match:
+                    continue
+                namespaces.update(match.group(2).split())
+                # Namespaces may also be listed as the directive content
+                for content in lines[i + 1:]:
+                    if content.strip() and (len(content) - len(
+                            content.lstrip()) <= len(match.group(1))):
+                        break
+                    if content.strip() and not content.strip()[0] == ':':
+                        namespaces.add(content.strip())
+    return sorted(namespaces)
+
+
+def _describe(value, depth=0):
+    # A stable description of an option attribute, without object ids
+    if isinstance(value, _SCALARS):
+        return value
+    if depth > 4:
+        return type(value).__name__
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [_describe(item, depth + 1) for item in value]
+        return sorted(items, key=repr) if isinstance(
+            value, (set, frozenset)) else items
+    if isinstance(value, dict):
+        return sorted((repr(key), _describe(item, depth + 1))
+                      for key, item in value.items())
+    if hasattr(value, 'pattern'):
+        return value.pattern
+    if callable(value) and hasattr(value, '__name__'):
+        return '%s.%s' % (getattr(value, '__module__', ''), value.__name__)
+    if hasattr(value, '__dict__'):
+        return (type(value).__name__, _describe(vars(value), depth + 1))
+    return type(value).__name__
+
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime
+
+
+def _loaded_files():
+    # The files of the loaded modules, and the import path directories
+    # whose modification time changes when a package is installed
+    paths = set(path for path in sys.path if os.path.isdir(path))
+    for module in list(sys.modules.values()):
+        path = getattr(module, '__file__', None)
+        if path:
+            if path.endswith(('.pyc', '.pyo')):
+                path = path[:-1]
+            paths.add(os.path.abspath(path))
+    return paths
+
+
+def hash_namespace(namespace):
+    """Return (namespace, hash of its option definitions or None, files)
+
+    Run in a worker process, as listing the options imports the modules
+    of the namespace and registers their options. files maps the path
+    of every file the options were loaded from to its size and time.
+    """
+
+    try:
+        from oslo_config import generator
+        listing = generator._list_opts([namespace])
+    except Exception:
+        return namespace, None, {}
+    digest = hashlib.sha1()
+    for name, groups in listing:
+        for group, opts in groups:
+            digest.update(repr(_describe(group)).encode('utf-8'))
+            for opt in opts:
+                digest.update(repr(_describe(opt)).encode('utf-8'))
+    files = dict((path, _stat(path)) for path in _loaded_files())
+    return namespace, digest.hexdigest(), files
+
+
+def unchanged(namespaces, previous):
+    """Return the namespaces whose files are as when they were hashed
+
+    previous maps a namespace to its (hash, files) from hash_namespace.
+    Files shared between namespaces are only looked at once.
+    """
+
+    stats = {}
+    result = []
+    for namespace in namespaces:
+        digest, files = previous.get(namespace, (None, None))
+        if digest is None or not files:
+            continue
+        for path, stat in files.items():
+            if path not in stats:
+                stats[path] = _stat(path)
+            if stats[path] != stat:
+                break
+        else:
+            result.append(namespace)
+    return result
+
+
+class CachedShowOptionsDirective(sphinxext.ShowOptionsDirective):
+    """show-options, reusing the rendered text of unchanged namespaces
+
+    The namespaces may be given as the directive argument, as in
+    opts.rst, or as the content as oslo_config.sphinxext expects.
+    """
+
+    optional_arguments = 1
+    final_argument_whitespace = True
+
+    def namespaces(self):
+        namespaces = []
+        for argument in self.arguments:
+            namespaces.extend(argument.split())
+        namespaces.extend(line.strip() for line in self.content
+                          if line.strip())
+        return tuple(namespaces)
+
+    def run(self):
+        env = self.state.document.settings.env
+        app = env.app
+        namespaces = self.namespaces()
+        digests = tuple(app.cachedopts_hashes.get(namespace)
+                        for namespace in namespaces)
+        for namespace in namespaces:
+            env.cachedopts_docs.setdefault(env.docname, set()).add(namespace)
+
+        key = None
+        if namespaces and None not in digests and \
+                'config-file' not in self.options:
+            key = (namespaces, tuple(sorted(self.options.items())), digests)
+        lines = app.cachedopts_renders.get(key)
+        if lines is not None:
+            env.cachedopts_stats['reused'] += 1
+            return self.parse(lines)
+
+        base = sphinxext.ShowOptionsDirective
+        if self.arguments and not (base.required_arguments or
+                                   base.optional_arguments):
+            # This oslo.config reads the namespaces from the content only
+            self.content = ViewList(list(namespaces))
+            self.arguments = []
+
+        captured = []
+        nested_parse = self.state.nested_parse
+
+        def capture(block, *args, **kwargs):
+            captured.append(list(block))
+            return nested_parse(block, *args, **kwargs)
+
+        self.state.nested_parse = capture
+        try:
+            result = super(CachedShowOptionsDirective, self).run()
+        finally:
+            del self.state.nested_parse
+        env.cachedopts_stats['rendered'] += 1
+        if key is not None and len(captured) == 1:
+            env.cachedopts_new[key] = captured[0]
+        return result
+
+    def parse(self, lines):
+        result = ViewList()
+        source_name = '<' + sphinxext.__name__ + '>'
+        for line in lines:
+            result.append(line, source_name)
+        node = nodes.section()
+        node.document = self.state.document
+        nested_parse_with_titles(self.state, result, node)
+        return node.children
+
+
+def _cache_path(app):
+    return os.path.join(app.doctreedir, CACHE_FILE)
+
+
+def builder_inited(app):
+    app.cachedopts_start = time.time()
+    cache = {}
+    try:
+        with open(_cache_path(app), 'rb') as f:
+            cache = pickle.load(f)
+    except (IOError, OSError, EOFError, pickle.UnpicklingError):
+        pass
+    if cache.get('version') != CACHE_VERSION:
+        cache = {}
+    app.cachedopts_renders = cache.get('renders', {})
+    previous = cache.get('namespaces', {})
+
+    env = app.env
+    if not hasattr(env, 'cachedopts_docs'):
+        env.cachedopts_docs = {}
+        env.cachedopts_hashes = {}
+    env.cachedopts_new = {}
+    env.cachedopts_stats = {'rendered': 0, 'reused': 0}
+
+    suffix = app.config.source_suffix
+    if not isinstance(suffix, str):
+        # A list, or a dict of suffix to file type since Sphinx 1.8
+        suffix = tuple(suffix)
+    namespaces = find_namespaces(app.srcdir, suffix)
+    kept = unchanged(namespaces, previous)
+    todo = [namespace for namespace in namespaces if namespace not in kept]
+    if len(todo) > 1:
+        # A new process per namespace keeps their imports apart
+        pool = multiprocessing.Pool(min(len(todo),
+                                        multiprocessing.cpu_count()),
+                                    maxtasksperchild=1)
+        try:
+            hashed = pool.map(hash_namespace, todo, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        hashed = [hash_namespace(namespace) for namespace in todo]
+
+    app.cachedopts_namespaces = dict((namespace, previous[namespace])
+                                     for namespace in kept)
+    for namespace, digest, files in hashed:
+        app.cachedopts_namespaces[namespace] = (digest, files)
+    app.cachedopts_hashes = dict(
+        (namespace, digest) for namespace, (digest, files)
+        in app.cachedopts_namespaces.items())
+    env.cachedopts_stats['hashed'] = len(todo)
+    _info(app, '[cachedopts] %d namespaces unchanged, %d hashed in %.2f s'
+          % (len(kept), len(todo), time.time() - app.cachedopts_start))
+
+
+def env_get_outdated(app, env, added, changed, removed):
+    # Some Sphinx versions pass the builder rather than the environment
+    env = app.env
+    previous = env.cachedopts_hashes
+    current = env.cachedopts_hashes = app.cachedopts_hashes
+
+    def changed_namespace(namespace):
+        # A namespace which could not be hashed is always read again
+        return (current.get(namespace) is None or
+                current.get(namespace) != previous.get(namespace))
+
+    return [docname for docname, namespaces in env.cachedopts_docs.items()
+            if docname not in removed and
+            any(changed_namespace(namespace) for namespace in namespaces)]
+
+
+def env_purge_doc(app, env, docname):
+    env.cachedopts_docs.pop(docname, None)
+
+
+def env_merge_info(app, env, docnames, other):
+    for docname in docnames:
+        if docname in other.cachedopts_docs:
+            env.cachedopts_docs[docname] = other.cachedopts_docs[docname]
+    env.cachedopts_new.update(other.cachedopts_new)
+    for name in ('rendered', 'reused'):
+        env.cachedopts_stats[name] += other.cachedopts_stats[name]
+
+
+def build_finished(app, exception):
+    if exception is not None:
+        return
+    env = app.env
+    renders = dict(app.cachedopts_renders)
+    renders.update(env.cachedopts_new)
+    env.cachedopts_new = {}
+    # Keep the renders of the current option definitions only
+    current = dict((key, lines) for key, lines in renders.items()
+                   if all(app.cachedopts_hashes.get(namespace) == digest
+                          for namespace, digest in zip(key[0], key[2])))
+    with open(_cache_path(app), 'wb') as f:
+        pickle.dump({'version': CACHE_VERSION,
+                     'namespaces': app.cachedopts_namespaces,
+                     'renders': current}, f, pickle.HIGHEST_PROTOCOL)
+    stats = env.cachedopts_stats
+    _info(app, '[cachedopts] build took %.2f s, %d namespaces hashed, '
+          '%d rendered, %d reused' % (time.time() - app.cachedopts_start,
+                                      stats['hashed'], stats['rendered'],
+                                      stats['reused']))
+
+
+def setup(app):
+    try:
+        app.add_directive('show-options', CachedShowOptionsDirective,
+                          override=True)
+    except TypeError:  # Sphinx < 1.8 always overrides
+        app.add_directive('show-options', CachedShowOptionsDirective)
+    app.connect('builder-inited', builder_inited)
+    app.connect('env-get-outdated', env_get_outdated)
+    app.connect('env-purge-doc', env_purge_doc)
+    app.connect('env-merge-info', env_merge_info)
+    app.connect('build-finished', build_finished)
+    return {'parallel_read_safe': True}
@@ -16,6 +16,7 @@ import os
 import sys
 
 sys.path.insert(0, os.path.abspath('../..'))
+sys.path.insert(0, os.path.abspath('.'))
 # -- General configuration ----------------------------------------------------
 
 # Add any Sphinx extension module names here, as strings. They can be
@@ -24,6 +25,7 @@ extensions = [
     'sphinx.ext.autodoc',
     'oslosphinx',
     'oslo_config.sphinxext',
+    'cachedopts',
 ]
 
 # The suffix of source filenames.
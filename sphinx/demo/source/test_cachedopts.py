@@ -0,0 +1,122 @@
+import os
+import re
+import shutil
+import tempfile
+import unittest
+
+try:
+    import cachedopts
+except ImportError:  # Sphinx or oslo.config is not installed
+    cachedopts = None
+
+
+class Env(object):
+
+    def __init__(self, docs, hashes):
+        self.cachedopts_docs = docs
+        self.cachedopts_hashes = hashes
+
+
+class App(object):
+
+    def __init__(self, env, hashes):
+        self.env = env
+        self.cachedopts_hashes = hashes
+
+
+@unittest.skipIf(cachedopts is None, 'Sphinx or oslo.config is not installed')
+class CachedOptsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def write(self, name, text):
+        path = os.path.join(self.tmp, name)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
+    def test_find_namespaces(self):
+        self.write('opts.rst', '.. show-options:: nova.api\n\n'
+                               '.. show-options:: nova  nova.cells\n')
+        self.write('sub/content.rst', 'Options\n\n'
+                                      '  .. show-options::\n'
+                                      '     :split-namespaces:\n\n'
+                                      '     oslo.log\n'
+                                      '     nova.api\n\n'
+                                      '  Not a namespace\n')
+        self.write('notes.txt', '.. show-options:: ignored\n')
+        self.assertEqual(cachedopts.find_namespaces(self.tmp),
+                         ['nova', 'nova.api', 'nova.cells', 'oslo.log'])
+        self.assertEqual(cachedopts.find_namespaces(self.tmp, '.txt'),
+                         ['ignored'])
+
+    def test_describe(self):
+        class Opt(object):
+            def __init__(self, default):
+                self.name = 'workers'
+                self.default = default
+                self.choices = set(['b', 'a'])
+                self.regex = re.compile('^[a-z]+$')
+                self.check = os.path.join
+
+        one, two = Opt(1), Opt(1)
+        self.assertEqual(cachedopts._describe(one),
+                         cachedopts._describe(two))
+        self.assertEqual(repr(cachedopts._describe(one)),
+                         repr(cachedopts._describe(two)))
+        self.assertNotIn('0x', repr(cachedopts._describe(one)))
+        self.assertNotEqual(cachedopts._describe(one),
+                            cachedopts._describe(Opt(2)))
+        self.assertEqual(cachedopts._describe({'a': ['b', None]}),
+                         [("'a'", ['b', None])])
+        self.assertEqual(cachedopts._describe(set([2, 1])), [1, 2])
+
+        # Deeply nested values are described by their type only
+        nested = [[[[[[object()]]]]]]
+        self.assertEqual(cachedopts._describe(nested),
+                         [[[[['list']]]]])
+
+    def test_env_get_outdated(self):
+        docs = {'opts': set(['nova', 'nova.api']),
+                'cells': set(['nova.cells']),
+                'gone': set(['nova.api']),
+                'broken': set(['missing'])}
+        hashes = {'nova': 'a', 'nova.api': 'b', 'nova.cells': 'c',
+                  'missing': None}
+        env = Env(docs, hashes)
+        app = App(env, dict(hashes))
+        app.cachedopts_hashes['nova.api'] = 'B'
+        self.assertEqual(
+            sorted(cachedopts.env_get_outdated(app, None, set(), set(),
+                                               set(['gone']))),
+            ['broken', 'opts'])
+        self.assertIs(env.cachedopts_hashes, app.cachedopts_hashes)
+
+        # Nothing changed since: only unhashable namespaces are read again
+        app = App(env, dict(app.cachedopts_hashes))
+        self.assertEqual(
+            cachedopts.env_get_outdated(app, None, set(), set(), set()),
+            ['broken'])
+
+    def test_unchanged(self):
+        path = self.write('opts.py', 'OPTS = []\n')
+        stat = cachedopts._stat(path)
+        previous = {'nova': ('a', {path: stat}),
+                    'nova.api': ('b', {}),
+                    'broken': (None, {path: stat})}
+        self.assertEqual(
+            cachedopts.unchanged(['nova', 'nova.api', 'broken', 'new'],
+                                 previous),
+            ['nova'])
+        self.write('opts.py', 'OPTS = [1]\n')
+        self.assertEqual(cachedopts.unchanged(['nova'], previous), [])
+        os.remove(path)
+        self.assertEqual(cachedopts.unchanged(['nova'], previous), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import unittest
+
+from demo import _catalog
+
+try:
+    from demo import _i18n
+except ImportError:  # oslo.i18n is not installed
+    _i18n = None
+
+
+def write_catalog(localedir, language, domain, messages):
+    messages_dir = os.path.join(localedir, language, 'LC_MESSAGES')
+    if not os.path.isdir(messages_dir):
+        os.makedirs(messages_dir)
+    _catalog.write_mo(os.path.join(messages_dir, domain + '.mo'), messages)
+
+
+class CatalogIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.addCleanup(_catalog.forget_indexes)
+        self.localedir = os.path.join(self.tmp, 'locale')
+        write_catalog(self.localedir, 'de', 'demo',
+                      {u'Hello': u'Hallo', u'caf\xe9 %s': u'Kaff\xe9e %s'})
+        write_catalog(self.localedir, 'de', 'demo-log-error',
+                      {u'Hello': u'Fehler: Hallo'})
+        write_catalog(self.localedir, 'fr', 'demo',
+                      {u'Hello': u'Bonjour'})
+        # Not a domain of the demo catalogs
+        write_catalog(self.localedir, 'fr', 'other', {u'Hello': u'Salut'})
+        self.index_path = os.path.join(self.tmp, 'demo.idx')
+
+    def test_compile_index(self):
+        count = _catalog.compile_index(self.localedir, 'demo',
+                                       self.index_path)
+        self.assertEqual(count, 4)
+        self.assertFalse(os.path.exists(self.index_path + '.tmp'))
+
+        index = _catalog.open_index(self.index_path)
+        self.assertIs(_catalog.open_index(self.index_path), index)
+        self.assertEqual(index.languages, ['de', 'fr'])
+        self.assertEqual(index.gettext('de', 'demo', u'Hello'), u'Hallo')
+        self.assertEqual(index.gettext('de', 'demo-log-error', u'Hello'),
+                         u'Fehler: Hallo')
+        self.assertEqual(index.gettext('de', 'demo', u'caf\xe9 %s'),
+                         u'Kaff\xe9e %s')
+        self.assertEqual(index.gettext('fr', 'demo', u'Hello'), u'Bonjour')
+        self.assertIsNone(index.gettext('fr', 'demo', u'caf\xe9 %s'))
+        self.assertIsNone(index.gettext('fr', 'other', u'Hello'))
+        self.assertIsNone(index.gettext('it', 'demo', u'Hello'))
+
+    def test_not_an_index(self):
+        with open(self.index_path, 'wb') as f:
+            f.write(b'not an index')
+        self.assertRaises(ValueError, _catalog.CatalogIndex, self.index_path)
+
+    def test_translator_fallback(self):
+        _catalog.compile_index(self.localedir, 'demo', self.index_path)
+        index = _catalog.open_index(self.index_path)
+
+        translate = index.translator('demo', ['de_DE', 'de'])
+        self.assertEqual(translate(u'Hello'), u'Hallo')
+        self.assertEqual(translate(u'Untranslated'), u'Untranslated')
+        # The first language with a translation of the msgid is used
+        translate = index.translator('demo', ['fr', 'de'])
+        self.assertEqual(translate(u'caf\xe9 %s'), u'Kaff\xe9e %s')
+        self.assertEqual(index.translator('demo', ['it'])(u'Hello'),
+                         u'Hello')
+
+    @unittest.skipIf(_i18n is None, 'oslo.i18n is not installed')
+    def test_index_languages(self):
+        self.assertEqual(_i18n._index_languages('de_DE.UTF-8'),
+                         ['de_DE', 'de'])
+        self.assertEqual(_i18n._index_languages('fr_FR@euro:de'),
+                         ['fr_FR', 'fr', 'de'])
+
+    @unittest.skipIf(_i18n is None, 'oslo.i18n is not installed')
+    def test_get_available_languages(self):
+        self.addCleanup(os.environ.pop, _i18n.LOCALEDIR_ENV, None)
+        self.addCleanup(_i18n.clear_cache)
+        os.environ[_i18n.LOCALEDIR_ENV] = self.localedir
+        # Whole seconds, which every platform stores exactly
+        mtime = 1500000000
+        os.utime(self.localedir, (mtime, mtime))
+
+        self.assertEqual(_i18n.get_available_languages(),
+                         ['en_US', 'de', 'fr'])
+
+        # Not listed again until the directory modification time changes
+        write_catalog(self.localedir, 'it', 'demo', {u'Hello': u'Ciao'})
+        os.utime(self.localedir, (mtime, mtime))
+        self.assertEqual(_i18n.get_available_languages(),
+                         ['en_US', 'de', 'fr'])
+        os.utime(self.localedir, (mtime, mtime + 10))
+        self.assertEqual(_i18n.get_available_languages(),
+                         ['en_US', 'de', 'fr', 'it'])
+
+        # A catalog added to an existing language directory
+        write_catalog(self.localedir, 'es', 'other', {u'Hello': u'Hola'})
+        messages_dir = os.path.join(self.localedir, 'es', 'LC_MESSAGES')
+        os.utime(messages_dir, (mtime, mtime))
+        self.assertEqual(_i18n.get_available_languages(),
+                         ['en_US', 'de', 'fr', 'it'])
+        localedir_mtime = os.stat(self.localedir).st_mtime
+        write_catalog(self.localedir, 'es', 'demo', {u'Hello': u'Hola'})
+        os.utime(messages_dir, (mtime, mtime + 10))
+        self.assertEqual(os.stat(self.localedir).st_mtime, localedir_mtime)
+        self.assertEqual(_i18n.get_available_languages(),
+                         ['en_US', 'de', 'es', 'fr', 'it'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from demo import checks
+
+
+class ChecksTestCase(unittest.TestCase):
+
+    def codes(self, source):
+        return [message.split()[0]
+                for line, column, message in checks.check_source(source)]
+
+    def test_eager_interpolation_in_translator(self):
+        self.assertEqual(self.codes('LOG.error(_LE("from %s" % s))'),
+                         ['D701'])
+        self.assertEqual(self.codes('_("{0}".format(s))'), ['D701'])
+        self.assertEqual(self.codes('LOG.error(_LE("from %s"), s)'), [])
+
+    def test_eager_interpolation_in_log(self):
+        self.assertEqual(self.codes('LOG.warning(_LW("file %s") % f)'),
+                         ['D702'])
+        self.assertEqual(self.codes('LOG.debug("file %s" % f)'), ['D702'])
+        self.assertEqual(self.codes('msg = _("file %s") % f'), [])
+
+    def test_warn(self):
+        self.assertEqual(self.codes('LOG.warn(_LW("file %s"), f)'),
+                         ['D703'])
+        self.assertEqual(self.codes('LOG.warn(_LW("%s %s"), (a, b))'),
+                         ['D703', 'D704'])
+
+    def test_syntax_error(self):
+        self.assertEqual(self.codes('def ('), ['D700'])
+
+    def test_check_paths_cache(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            source = os.path.join(tmp, 'a.py')
+            cache = os.path.join(tmp, 'cache.json')
+            with open(source, 'w') as f:
+                f.write('LOG.warn("x")\n')
+            first = checks.check_paths([tmp], jobs=1, cache_file=cache)
+            self.assertTrue(os.path.exists(cache))
+            self.assertEqual(len(first[source]), 1)
+
+            # Unchanged files are not parsed again
+            check_source = checks.check_source
+            self.addCleanup(setattr, checks, 'check_source', check_source)
+            checks.check_source = None
+            second = checks.check_paths([tmp], jobs=1, cache_file=cache)
+            self.assertEqual(first, second)
+
+            # Changed ones are
+            with open(source, 'w') as f:
+                f.write('LOG.warn("x")\nLOG.warn("y")\n')
+            self.assertRaises(TypeError, checks.check_paths, [tmp], jobs=1,
+                              cache_file=cache)
+            checks.check_source = check_source
+            third = checks.check_paths([tmp], jobs=1, cache_file=cache)
+            self.assertEqual(len(third[source]), 2)
+        finally:
+            shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,199 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from demo import confsample
+
+SAMPLE = """[DEFAULT]
+
+#
+# From keystone
+#
+
+# Limit the sizes of user & project ID/names. (integer value)
+# Minimum value: 1
+# Maximum value: 255
+#max_param_size = 64
+
+# Enables or disables syslog rfc5424 format for logging. (boolean
+# value)
+# Deprecated group/name - [DEFAULT]/rfc_format
+# This option is deprecated for removal.
+# Its value may be silently ignored in the future.
+# Reason: Going away.
+#use_syslog_rfc_format = true
+
+
+[token]
+
+# Token provider. (string value)
+# Allowed values: uuid, fernet
+#provider = uuid
+
+# Hosts to use. (multi valued)
+#hosts =
+
+
+[nova]
+
+#
+# From nova.conf
+#
+
+#
+# Availability zone for internal services.
+#
+# Possible values:
+#
+# * Any string representing an availability zone name
+#
+#  (string value)
+#internal_service_availability_zone = internal
+
+#
+# Default availability zone for compute services.
+#  (string value)
+#default_availability_zone = nova
+"""
+
+
+class ConfSampleTestCase(unittest.TestCase):
+
+    def setUp(self):
+        confsample.forget_indexes()
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def write(self, name, text):
+        path = os.path.join(self.tmp, name)
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
+    def test_parse(self):
+        index = confsample.parse(SAMPLE.splitlines())
+        self.assertEqual(sorted(index), ['DEFAULT', 'nova', 'token'])
+        param = index['DEFAULT']['max_param_size']
+        self.assertEqual(param.default, '64')
+        self.assertEqual(param.type, 'integer')
+        self.assertEqual(param.range, ('1', '255'))
+        self.assertEqual(param.help, (7, 7))
+        rfc = index['DEFAULT']['use_syslog_rfc_format']
+        self.assertEqual(rfc.type, 'boolean')
+        self.assertEqual(rfc.deprecated,
+                         ('[DEFAULT]/rfc_format',
+                          'For removal. Reason: Going away.'))
+        self.assertEqual(rfc.help, (12, 13))
+        provider = index['token']['provider']
+        self.assertEqual(provider.allowed, ('uuid', 'fernet'))
+        self.assertEqual(index['token']['hosts'].type, 'multi')
+        self.assertEqual(index['token']['hosts'].default, '')
+
+    def test_parse_help_paragraphs(self):
+        index = confsample.parse(SAMPLE.splitlines())
+        self.assertEqual(sorted(index['nova']),
+                         ['default_availability_zone',
+                          'internal_service_availability_zone'])
+        zone = index['nova']['internal_service_availability_zone']
+        self.assertEqual(zone.default, 'internal')
+        self.assertEqual(zone.type, 'string')
+        self.assertEqual(zone.help, (38, 44))
+        self.assertEqual(index['nova']['default_availability_zone'].help,
+                         (48, 49))
+
+        # A changed paragraph changes the help, a moved option does not
+        changed = confsample.parse(SAMPLE.replace(
+            '# * Any string', '# * A string').splitlines())
+        self.assertEqual(
+            [change[:3] for change in confsample.diff(index, changed)],
+            [('nova', 'internal_service_availability_zone', 'help')])
+
+    def test_diff(self):
+        old = self.write('old', SAMPLE)
+        new = self.write('new', '\n' + SAMPLE.replace(
+            '#provider = uuid', '#provider = fernet').replace(
+            'Token provider.', 'The token provider.').replace(
+            '# Hosts to use. (multi valued)\n#hosts =\n', ''))
+        changes = confsample.diff_files(old, new)
+        self.assertEqual(
+            [change[:3] for change in changes],
+            [('token', 'hosts', 'removed'),
+             ('token', 'provider', 'default'),
+             ('token', 'provider', 'help')])
+        self.assertEqual(changes[1][3:], ('uuid', 'fernet'))
+        # Only the help span of every option moved
+        self.assertEqual(confsample.diff_files(
+            old, self.write('moved', '\n\n' + SAMPLE)), [])
+
+    def test_parse_multi_defaults(self):
+        index = confsample.parse(SAMPLE.replace(
+            '#hosts =\n', '#hosts = a\n#hosts = b\n').splitlines())
+        hosts = index['token']['hosts']
+        self.assertEqual(hosts.default, ('a', 'b'))
+        self.assertEqual(hosts.type, 'multi')
+        self.assertEqual(hosts.help, (27, 27))
+
+        old = self.write('old', SAMPLE.replace('#hosts =\n', '#hosts = a\n'))
+        new = self.write('new', SAMPLE.replace('#hosts =\n',
+                                               '#hosts = a\n#hosts = b\n'))
+        cache_dir = os.path.join(self.tmp, 'cache')
+        changes = confsample.diff_files(old, new, cache_dir)
+        self.assertEqual(changes, [('token', 'hosts', 'default', 'a',
+                                    ('a', 'b'))])
+        self.assertEqual(confsample.format_change(changes[0]),
+                         '[token] hosts: default %r -> %r' % changes[0][3:])
+        # As read back from the cache directory
+        confsample.forget_indexes()
+        self.assertEqual(confsample.index_file(new, cache_dir)[1], index)
+
+    def test_format_change_without_help(self):
+        old = self.write('old', SAMPLE)
+        new = self.write('new', SAMPLE.replace(
+            '# Hosts to use. (multi valued)\n', ''))
+        changes = confsample.diff_files(old, new)
+        self.assertEqual(
+            [confsample.format_change(change) for change in changes],
+            ['[token] hosts: type %r -> None' % changes[0][3],
+             '[token] hosts: help changed, lines 27-27 -> no help'])
+        self.assertEqual(confsample.main([new, old, '--no-cache']), 1)
+
+    def test_cache(self):
+        old = self.write('old', SAMPLE)
+        new = self.write('new', SAMPLE.replace('#provider = uuid',
+                                               '#provider = fernet'))
+        cache_dir = os.path.join(self.tmp, 'cache')
+        digest, index = confsample.index_file(old, cache_dir)
+        self.assertIs(confsample.index_file(old, cache_dir)[1], index)
+        self.assertEqual(os.listdir(cache_dir), [digest + '.json'])
+
+        # A new process only loads the indexes of the files it compares
+        confsample.forget_indexes()
+        parse = confsample.parse
+        self.addCleanup(setattr, confsample, 'parse', parse)
+        confsample.parse = None
+        self.assertEqual(confsample.index_file(old, cache_dir),
+                         (digest, index))
+        self.assertEqual(list(confsample._indexes), [digest])
+        confsample.parse = parse
+        self.assertEqual(len(confsample.diff_files(old, new, cache_dir)), 1)
+        self.assertEqual(len(os.listdir(cache_dir)), 2)
+
+    def test_cache_pruned(self):
+        cache_dir = os.path.join(self.tmp, 'cache')
+        self.addCleanup(setattr, confsample, 'CACHE_ENTRIES',
+                        confsample.CACHE_ENTRIES)
+        confsample.CACHE_ENTRIES = 2
+        paths = [self.write(str(i), SAMPLE + '#option_%d = %d\n' % (i, i))
+                 for i in range(3)]
+        digests = []
+        for i, path in enumerate(paths):
+            digests.append(confsample.index_file(path, cache_dir)[0])
+            cached = os.path.join(cache_dir, digests[-1] + '.json')
+            os.utime(cached, (1500000000 + i, 1500000000 + i))
+        self.assertEqual(sorted(os.listdir(cache_dir)),
+                         sorted(digest + '.json' for digest in digests[1:]))
+
+
+if __name__ == '__main__':
+    unittest.main()
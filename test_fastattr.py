@@ -0,0 +1,89 @@
+import unittest
+
+from demo import delattr2
+from demo import fastattr
+
+
+class FastAttrTestCase(unittest.TestCase):
+    """fastattr.Child behaves as delattr2.Child"""
+
+    def namespaces(self):
+        return delattr2.Child(), fastattr.Child()
+
+    def assertSameError(self, func, *args):
+        messages = []
+        for namespace in self.namespaces():
+            with self.assertRaises(AttributeError) as cm:
+                func(namespace, *args)
+            messages.append(str(cm.exception))
+        self.assertEqual(messages[0], messages[1])
+        return messages[0]
+
+    def test_set_get(self):
+        for namespace in self.namespaces():
+            self.assertEqual(namespace._cli, {})
+            namespace.x = 'x'
+            namespace.y = 1
+            namespace.x = 'z'
+            self.assertEqual(namespace._cli, {'x': 'z', 'y': 1})
+            self.assertEqual((namespace.x, getattr(namespace, 'y')),
+                             ('z', 1))
+            self.assertTrue(hasattr(namespace, 'x'))
+            self.assertFalse(hasattr(namespace, 'missing'))
+
+    def test_missing_attribute(self):
+        self.assertEqual(
+            self.assertSameError(getattr, 'missing'),
+            "'_Namespace' object has no attribute 'missing'")
+
+    def test_parse(self):
+        for namespace in self.namespaces():
+            namespace.x = 'x'
+            namespace.parse()
+            self.assertEqual(namespace._unrecognized_args, [])
+            self.assertEqual(namespace._cli, {'x': 'x'})
+            self.assertEqual(vars(namespace)['_unrecognized_args'], [])
+
+            # vars(self).setdefault keeps the arguments already set
+            namespace._unrecognized_args.append('--extra')
+            namespace.parse()
+            self.assertEqual(namespace._unrecognized_args, ['--extra'])
+
+    def test_delete(self):
+        for namespace in self.namespaces():
+            namespace.x = 'x'
+            namespace.y = 'y'
+            namespace.parse()
+            del namespace.x
+            self.assertEqual(namespace._cli, {'y': 'y'})
+            self.assertFalse(hasattr(namespace, 'x'))
+
+            del namespace._unrecognized_args
+            self.assertNotIn('_unrecognized_args', vars(namespace))
+            self.assertEqual(namespace._cli, {'y': 'y'})
+            namespace.parse()
+            self.assertEqual(namespace._unrecognized_args, [])
+
+    def test_delete_missing(self):
+        # Both raise AttributeError, with the message of the class for
+        # fastattr.Child, which does not define __delattr__
+        for namespace in self.namespaces():
+            self.assertRaises(AttributeError, delattr, namespace, 'missing')
+            namespace.x = 'x'
+            del namespace.x
+            self.assertRaises(AttributeError, delattr, namespace, 'x')
+
+    def test_cli_is_read_only(self):
+        # delattr2.Child stores an option named _cli, which can then
+        # never be read back; fastattr.Child refuses it
+        namespace = delattr2.Child()
+        namespace._cli = 'cli'
+        self.assertEqual(namespace._cli, {'_cli': 'cli'})
+
+        namespace = fastattr.Child()
+        self.assertRaises(AttributeError, setattr, namespace, '_cli', 'cli')
+        self.assertEqual(namespace._cli, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+
+from demo import _catalog
+
+try:
+    import oslo_i18n
+
+    from demo import _i18n
+except ImportError:  # oslo.i18n is not installed
+    _i18n = None
+
+
+def write_catalog(localedir, language, domain, messages):
+    messages_dir = os.path.join(localedir, language, 'LC_MESSAGES')
+    if not os.path.isdir(messages_dir):
+        os.makedirs(messages_dir)
+    _catalog.write_mo(os.path.join(messages_dir, domain + '.mo'), messages)
+
+
+@unittest.skipIf(_i18n is None, 'oslo.i18n is not installed')
+class TranslatorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.localedir = os.path.join(self.tmp, 'locale')
+        for language, hello in (('de', u'Hallo'), ('fr', u'Bonjour')):
+            write_catalog(self.localedir, language, 'demo',
+                          {u'Hello': hello})
+            write_catalog(self.localedir, language, 'demo-log-info',
+                          {u'Hello': u'[info] ' + hello})
+
+        self.environ = dict(os.environ)
+        self.addCleanup(self.restore_environ)
+        for name in ('LANGUAGE', 'LC_ALL', 'LC_MESSAGES', 'LANG',
+                     _i18n.CATALOG_INDEX_ENV):
+            os.environ.pop(name, None)
+        os.environ[_i18n.LOCALEDIR_ENV] = self.localedir
+        os.environ['LANGUAGE'] = 'de'
+
+        translators = _i18n._translators
+        self.addCleanup(setattr, _i18n, '_translators', translators)
+        _i18n._translators = oslo_i18n.TranslatorFactory(
+            _i18n.DOMAIN, localedir=self.localedir)
+        self.addCleanup(_i18n.clear_cache)
+        self.addCleanup(oslo_i18n.enable_lazy, False)
+
+    def restore_environ(self):
+        os.environ.clear()
+        os.environ.update(self.environ)
+
+    def test_eager(self):
+        _i18n.clear_cache()
+        self.assertEqual(_i18n._(u'Hello'), u'Hallo')
+        self.assertEqual(_i18n._LI(u'Hello'), u'[info] Hallo')
+        self.assertEqual(_i18n._(u'Untranslated'), u'Untranslated')
+        # The TranslatorFactory function itself, without a cache
+        self.assertFalse(hasattr(_i18n._, 'cache_info'))
+
+        # clear_cache() creates the translators again; those imported
+        # before keep working
+        translate = _i18n._
+        _i18n.clear_cache()
+        self.assertIsNot(_i18n._, translate)
+        self.assertEqual(translate(u'Hello'), u'Hallo')
+        self.assertEqual(_i18n._(u'Hello'), u'Hallo')
+
+    def test_lazy_memoized(self):
+        oslo_i18n.enable_lazy()
+        _i18n.clear_cache()
+        message = _i18n._(u'Hello')
+        self.assertIsInstance(message, oslo_i18n._message.Message)
+        self.assertIs(_i18n._(u'Hello'), message)
+        self.assertIsNot(_i18n._(u'Untranslated'), message)
+        self.assertEqual(_i18n._.cache_info()[:2], (1, 2))
+
+        # One Message serves every language, translated when emitted
+        self.assertEqual(oslo_i18n.translate(message, 'de'), u'Hallo')
+        self.assertEqual(oslo_i18n.translate(message, 'fr'), u'Bonjour')
+        self.assertEqual(
+            oslo_i18n.translate(_i18n._(u'Hello %s') % u'Welt', 'de'),
+            u'Hello Welt')
+
+        # clear_cache() starts an empty cache
+        _i18n.clear_cache()
+        self.assertEqual(_i18n._.cache_info()[:2], (0, 0))
+        self.assertIsNot(_i18n._(u'Hello'), message)
+
+        # Eager again once lazy translation is disabled
+        oslo_i18n.enable_lazy(False)
+        _i18n.clear_cache()
+        self.assertEqual(_i18n._(u'Hello'), u'Hallo')
+
+    def test_lazy_cache_size(self):
+        self.addCleanup(setattr, _i18n, 'CACHE_SIZE', _i18n.CACHE_SIZE)
+        _i18n.CACHE_SIZE = 2
+        oslo_i18n.enable_lazy()
+        _i18n.clear_cache()
+        first = _i18n._LI(u'one')
+        _i18n._LI(u'two')
+        _i18n._LI(u'three')
+        self.assertEqual(_i18n._LI.cache_info()[3], 2)
+        self.assertIsNot(_i18n._LI(u'one'), first)
+
+    def test_lru_cache_py27(self):
+        calls = []
+        cached = _i18n._lru_cache_py27(2)(
+            lambda msg: calls.append(msg) or msg.upper())
+        self.assertEqual([cached(msg) for msg in 'aaba'], list('AABA'))
+        self.assertEqual(calls, ['a', 'b'])
+        self.assertEqual(cached.cache_info(), (2, 2, 2, 2))
+        # The least recently used message ID is dropped
+        cached('c')
+        cached('a')
+        self.assertEqual(calls, ['a', 'b', 'c'])
+        cached('b')
+        self.assertEqual(calls, ['a', 'b', 'c', 'b'])
+
+    def test_catalog_index(self):
+        index_path = os.path.join(self.tmp, 'demo.idx')
+        _catalog.compile_index(self.localedir, _i18n.DOMAIN, index_path)
+        os.environ[_i18n.CATALOG_INDEX_ENV] = index_path
+        os.environ['LANGUAGE'] = 'fr_FR.UTF-8'
+        _i18n.clear_cache()
+        self.assertEqual(_i18n._(u'Hello'), u'Bonjour')
+        self.assertEqual(_i18n._LI(u'Hello'), u'[info] Bonjour')
+        self.assertEqual(_i18n._LW(u'Hello'), u'Hello')
+
+
+class Handler(logging.Handler):
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+@unittest.skipIf(_i18n is None, 'oslo.i18n is not installed')
+class DeferredTranslatorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+        self.addCleanup(setattr, _i18n, '_LI', _i18n._LI)
+        _i18n._LI = self.translate
+        self.deferred = _i18n._DeferredTranslator('_LI')
+
+        self.log = logging.getLogger('test_i18n.deferred')
+        self.handler = Handler()
+        self.log.addHandler(self.handler)
+        self.addCleanup(self.log.removeHandler, self.handler)
+        self.log.propagate = False
+        self.log.setLevel(logging.WARNING)
+
+    def translate(self, msg):
+        self.calls.append(msg)
+        return u'<' + msg + u'>'
+
+    def test_filtered_out(self):
+        self.log.info(self.deferred(u'open %s'), u'file')
+        self.log.info(self.deferred(u'open %(file)s') % {'file': u'x'})
+        self.assertEqual(self.handler.messages, [])
+        self.assertEqual(self.calls, [])
+
+    def test_emitted(self):
+        self.log.warning(self.deferred(u'open %s in %s'), u'file', u'dir')
+        self.log.warning(self.deferred(u'open %(file)s'), {'file': u'f'})
+        self.log.warning(self.deferred(u'open %s') % u'g')
+        self.log.warning(self.deferred(u'open'))
+        self.assertEqual(self.handler.messages,
+                         [u'<open file in dir>', u'<open f>', u'<open g>',
+                          u'<open>'])
+        self.assertEqual(sorted(set(self.calls)),
+                         [u'open', u'open %(file)s', u'open %s',
+                          u'open %s in %s'])
+
+    def test_translated_after_clear_cache(self):
+        # The translator is looked up when the message is emitted
+        message = self.deferred(u'open')
+        _i18n._LI = lambda msg: u'[' + msg + u']'
+        self.assertEqual(u'%s' % message, u'[open]')
+
+    def test_cache_size(self):
+        self.addCleanup(setattr, _i18n, 'CACHE_SIZE', _i18n.CACHE_SIZE)
+        _i18n.CACHE_SIZE = 2
+        first = self.deferred(u'one')
+        self.assertIs(self.deferred(u'one'), first)
+        self.deferred(u'two')
+        self.assertEqual(len(self.deferred), 2)
+        # The cache is emptied once full
+        self.deferred(u'three')
+        self.assertEqual(list(self.deferred), [u'three'])
+        self.assertIsNot(self.deferred(u'one'), first)
+        self.assertEqual(self.calls, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
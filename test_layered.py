@@ -0,0 +1,76 @@
+import unittest
+
+from demo import layered
+
+
+class LayeredTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.defaults = {'x': 'default', 'y': 'default', 'z': 'default'}
+        self.config = {'y': 'config', 'z': 'config'}
+        self.layers = layered.Layers(self.defaults, self.config)
+
+    def test_precedence(self):
+        namespace = self.layers.namespace()
+        namespace.z = 'cli'
+        self.assertEqual((namespace.x, namespace.y, namespace.z),
+                         ('default', 'config', 'cli'))
+        self.assertEqual(namespace._cli, {'z': 'cli'})
+
+    def test_copy_on_write(self):
+        one = self.layers.namespace()
+        two = self.layers.namespace()
+        one.x = 'cli'
+        self.assertEqual(two.x, 'default')
+        self.assertEqual(self.defaults['x'], 'default')
+        self.assertEqual(two._cli, {})
+
+    def test_delete_exposes_lower_layer(self):
+        namespace = self.layers.namespace()
+        namespace.y = 'cli'
+        del namespace.y
+        self.assertEqual(namespace.y, 'config')
+        self.assertEqual(namespace._cli, {})
+
+    def test_set_invalidates_flattened_layers(self):
+        namespace = self.layers.namespace()
+        self.assertEqual(namespace.y, 'config')
+        self.layers.set('y', 'reloaded')
+        self.assertEqual(namespace.y, 'reloaded')
+        self.layers.set('x', 'new default', layer=0)
+        self.assertEqual(namespace.x, 'new default')
+        self.layers.delete('y')
+        self.assertEqual(namespace.y, 'default')
+
+    def test_missing_attribute(self):
+        namespace = self.layers.namespace()
+        message = "'_Namespace' object has no attribute '%s'"
+        with self.assertRaises(AttributeError) as cm:
+            namespace.missing
+        self.assertEqual(str(cm.exception), message % 'missing')
+
+        # The layers below are shared and not deleted from
+        for name in ('x', 'missing'):
+            with self.assertRaises(AttributeError) as cm:
+                delattr(namespace, name)
+            self.assertEqual(str(cm.exception), message % name)
+        self.assertEqual(namespace.x, 'default')
+
+    def test_parse(self):
+        namespace = self.layers.namespace()
+        namespace.x = 'cli'
+        namespace.parse()
+        self.assertEqual(namespace._unrecognized_args, [])
+        self.assertEqual(namespace._cli, {'x': 'cli'})
+        del namespace._unrecognized_args
+        self.assertNotIn('_unrecognized_args', vars(namespace))
+
+    def test_empty_layers(self):
+        namespace = layered.Child()
+        namespace.x = 'cli'
+        self.assertEqual(namespace.x, 'cli')
+        self.assertRaises(AttributeError, getattr, namespace, 'y')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import logging as py_logging
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'oslo_log', 'examples'))
+import log_levels  # noqa
+
+
+class LogLevelTrieTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # Loggers of their own, apart from those of the process
+        self.manager = py_logging.Manager(
+            py_logging.RootLogger(py_logging.WARNING))
+
+    def logger(self, name, level=None):
+        logger = self.manager.getLogger(name)
+        if level is not None:
+            logger.setLevel(level)
+        return logger
+
+    def test_parse_level(self):
+        self.assertEqual(log_levels.parse_level('WARN'), py_logging.WARNING)
+        self.assertEqual(log_levels.parse_level(' debug '), py_logging.DEBUG)
+        self.assertEqual(log_levels.parse_level('15'), 15)
+        self.assertRaises(ValueError, log_levels.parse_level, 'LOUD')
+
+    def test_invalid_entry(self):
+        self.assertRaises(ValueError, log_levels.LogLevelTrie, ['pkg'])
+
+    def test_resolve(self):
+        trie = log_levels.LogLevelTrie(
+            ['pkg=WARN', 'pkg.mod=DEBUG', 'pkg=ERROR', 'other.sub=INFO'],
+            root_level=py_logging.CRITICAL)
+        self.assertEqual(trie.resolve('pkg'), py_logging.ERROR)
+        self.assertEqual(trie.resolve('pkg.mod.x'), py_logging.DEBUG)
+        self.assertEqual(trie.resolve('pkg.other'), py_logging.ERROR)
+        self.assertEqual(trie.resolve('pkgx'), py_logging.CRITICAL)
+        # 'other' itself is not configured, only its sub-package
+        self.assertEqual(trie.resolve('other'), py_logging.CRITICAL)
+        self.assertEqual(trie.resolve('other.sub.x'), py_logging.INFO)
+        # Remembered for the next lookup
+        self.assertIn('pkg.mod.x', trie._resolved)
+        self.assertEqual(trie.resolve('pkg.mod.x'), py_logging.DEBUG)
+
+    def test_configured(self):
+        trie = log_levels.LogLevelTrie(['pkg.mod=DEBUG'])
+        self.assertTrue(trie.configured('pkg.mod'))
+        self.assertFalse(trie.configured('pkg'))
+        self.assertFalse(trie.configured('pkg.mod.x'))
+        self.assertFalse(trie.configured('other'))
+
+    def test_apply(self):
+        pkg = self.logger('pkg', py_logging.INFO)
+        child = self.logger('pkg.child')
+        grandchild = self.logger('pkg.child.x')
+        other = self.logger('other')
+        trie = log_levels.LogLevelTrie(['pkg=WARN'])
+        self.assertEqual(trie.apply(self.manager), 3)
+        self.assertEqual(pkg.level, py_logging.WARNING)
+        self.assertEqual(child.level, py_logging.WARNING)
+        self.assertEqual(grandchild.level, py_logging.WARNING)
+        # Outside every configured prefix: still inherits from the root
+        self.assertEqual(other.level, py_logging.NOTSET)
+        self.assertEqual(trie.apply(self.manager), 0)
+
+    def test_apply_keeps_levels_set_in_between(self):
+        pkg = self.logger('pkg', py_logging.WARNING)
+        mod = self.logger('pkg.mod', py_logging.DEBUG)
+        x = self.logger('pkg.mod.x')
+        trie = log_levels.LogLevelTrie(['pkg=WARN'])
+        self.assertEqual(trie.apply(self.manager), 0)
+        self.assertEqual(pkg.level, py_logging.WARNING)
+        self.assertEqual(mod.level, py_logging.DEBUG)
+        self.assertEqual(x.level, py_logging.NOTSET)
+        self.assertEqual(x.getEffectiveLevel(), py_logging.DEBUG)
+
+    def test_apply_placeholders(self):
+        # pkg.mod only exists as a PlaceHolder for pkg.mod.x
+        x = self.logger('pkg.mod.x')
+        trie = log_levels.LogLevelTrie(['pkg=ERROR', 'pkg.mod=INFO'])
+        self.assertEqual(trie.apply(self.manager), 1)
+        self.assertEqual(x.level, py_logging.INFO)
+        self.assertIsInstance(self.manager.loggerDict['pkg.mod'],
+                              py_logging.PlaceHolder)
+
+
+if __name__ == '__main__':
+    unittest.main()
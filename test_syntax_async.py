@@ -0,0 +1,172 @@
+import logging as py_logging
+import os
+import sys
+import threading
+import unittest
+
+try:
+    import queue
+except ImportError:  # Python 2.7
+    import Queue as queue
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'oslo_log', 'examples'))
+try:
+    import syntax
+    import syntax_async
+except ImportError:  # oslo.log is not installed
+    syntax_async = None
+
+
+class Handler(py_logging.Handler):
+    """Keep the handled messages, stalling while the gate is closed"""
+
+    def __init__(self):
+        py_logging.Handler.__init__(self)
+        self.messages = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.stalled = threading.Event()
+
+    def emit(self, record):
+        if not self.gate.is_set():
+            self.stalled.set()
+            self.gate.wait()
+        self.messages.append(record.getMessage())
+
+
+def record(msg, *args):
+    return py_logging.LogRecord('test', py_logging.INFO, __file__, 1, msg,
+                                args, None)
+
+
+@unittest.skipIf(syntax_async is None, 'oslo.log is not installed')
+class QueueHandlerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.handler = Handler()
+        self.records = queue.Queue(1)
+
+    def listen(self):
+        listener = syntax_async.QueueListener(self.records, [self.handler])
+        listener.start()
+        self.addCleanup(self.handler.gate.set)
+        return listener
+
+    def stall(self, queue_handler):
+        # The listener holds the first record in the handler, and the
+        # second one fills the queue
+        self.handler.gate.clear()
+        queue_handler.emit(record('one'))
+        self.assertTrue(self.handler.stalled.wait(5))
+        queue_handler.emit(record('two'))
+        self.assertTrue(self.records.full())
+
+    def test_unknown_policy(self):
+        self.assertRaises(ValueError, syntax_async.QueueHandler,
+                          self.records, 'wait')
+
+    def test_prepare_interpolates(self):
+        args = ['file']
+        queued = syntax_async.QueueHandler(self.records)
+        queued.emit(record('open %s', args))
+        args.append('changed')
+        self.assertEqual(self.records.get_nowait().msg, "open ['file']")
+
+    def test_block(self):
+        listener = self.listen()
+        queued = syntax_async.QueueHandler(self.records, 'block')
+        self.stall(queued)
+
+        blocked = threading.Thread(target=queued.emit,
+                                   args=(record('three'),))
+        blocked.start()
+        blocked.join(0.2)
+        self.assertTrue(blocked.is_alive())
+
+        self.handler.gate.set()
+        blocked.join(5)
+        self.assertFalse(blocked.is_alive())
+        listener.stop()
+        self.assertEqual(self.handler.messages, ['one', 'two', 'three'])
+        self.assertEqual(queued.dropped, 0)
+
+    def test_drop(self):
+        for overflow in ('drop', 'count'):
+            self.handler = Handler()
+            listener = self.listen()
+            queued = syntax_async.QueueHandler(self.records, overflow)
+            self.stall(queued)
+            queued.emit(record('three'))
+            queued.emit(record('four'))
+            self.assertEqual(queued.dropped, 2)
+
+            self.handler.gate.set()
+            listener.stop()
+            self.assertEqual(self.handler.messages, ['one', 'two'])
+
+
+@unittest.skipIf(syntax_async is None, 'oslo.log is not installed')
+class ShutdownTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.root = py_logging.getLogger()
+        handlers = self.root.handlers[:]
+        self.addCleanup(setattr, self.root, 'handlers', handlers)
+        self.addCleanup(setattr, syntax_async, '_listener', None)
+        self.addCleanup(setattr, syntax, 'prepare', syntax.prepare)
+        self.handler = Handler()
+        self.root.handlers = [self.handler]
+        # Leave the configuration of Oslo Logging alone
+        syntax.prepare = lambda: None
+
+    def queue_handlers(self):
+        return [handler for handler in self.root.handlers
+                if isinstance(handler, syntax_async.QueueHandler)]
+
+    def test_shutdown(self):
+        syntax_async.prepare(queue_size=1, overflow='count')
+        self.assertEqual(self.root.handlers, self.queue_handlers())
+        self.handler.gate.clear()
+        self.addCleanup(self.handler.gate.set)
+        syntax_async.LOG.warning('one')
+        self.assertTrue(self.handler.stalled.wait(5))
+        syntax_async.LOG.warning('two')
+        syntax_async.LOG.warning('three')
+
+        # Records logged while shutting down are not lost
+        stop = syntax_async.QueueListener.stop
+        self.addCleanup(setattr, syntax_async.QueueListener, 'stop', stop)
+
+        def logging_stop(listener):
+            self.handler.gate.set()
+            syntax_async.LOG.warning('stopping')
+            stop(listener)
+
+        syntax_async.QueueListener.stop = logging_stop
+        syntax_async.shutdown()
+        self.assertEqual(self.root.handlers, [self.handler])
+        # 'stopping' may be written before the listener writes 'two'
+        self.assertEqual(sorted(self.handler.messages[:3]),
+                         ['one', 'stopping', 'two'])
+        self.assertEqual(self.handler.messages[3:],
+                         ['Dropped 1 log records on a full queue'])
+        self.assertIsNone(syntax_async._listener)
+
+    def test_prepare_again(self):
+        syntax_async.prepare()
+        first = syntax_async._listener
+        thread = first._thread
+        syntax_async.prepare()
+        self.assertIsNot(syntax_async._listener, first)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(self.queue_handlers()), 1)
+
+        syntax_async.LOG.warning('once')
+        syntax_async.shutdown()
+        self.assertEqual(self.handler.messages, ['once'])
+        self.assertEqual(self.root.handlers, [self.handler])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -30,7 +30,7 @@ More information can be found at:
 # OpenStack Style Guidelines exception for import statements
 # See http://docs.openstack.org/developer/hacking/#imports
 
-from demo._i18n import _, _LW, _LE
+from demo._i18n import _, _LW, _LE, _DLI, _DLW
 
 # We use the Python standard logging library in this demo
 # which enables simple cut/paste demostration syntax.
@@ -110,7 +110,23 @@ class Demo(object):
             str = "s"
             int(str)
         except ValueError:
-            LOG.error(_LE("Unable to parse integer from %s" % str))
+            LOG.error(_LE("Unable to parse integer from %s"), str)
+
+    @staticmethod
+    def warning_deferred():
+
+        LOG.debug("Demonstrating the use of _DLW and _DLI for deferred "
+                  "translation")
+        try:
+            file_name = ".does.not.exist"
+            open(file_name, "r")
+        except Exception:
+            # The deferred translators return a message which is only
+            # translated and interpolated when the record is emitted, so
+            # a call filtered out by the log level does no translation
+            # work at all.
+            LOG.warning(_DLW("Unable to open file %s"), file_name)
+            LOG.info(_DLI("Skipped reading file %s"), file_name)
 
     @staticmethod
     def error_and_raise():
@@ -129,6 +145,7 @@ if __name__ == '__main__':
         Demo.warning_multi()
         Demo.warning_with_traceback()
         Demo.error()
+        Demo.warning_deferred()
         try:
             Demo.error_and_raise()
         except IOError as e: